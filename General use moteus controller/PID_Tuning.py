@@ -1,88 +1,38 @@
-import moteus
-import math
 import asyncio
 import matplotlib.pyplot as plt
-import numpy as np
 
-# Initialize the controller
-c1 = moteus.Controller(1)
+from Xbox_controller.pd_tuner import PDTuner, NELDER_MEAD, step_test, load_history, save_history
+from Xbox_controller.telemetry import TelemetryRecorder
+from Xbox_controller.controller_pool import get_pool
+
+# Controller under test (created on first use)
+c1_id = 1
 
 # List of positions
 ma = [0.0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0]
 
-distance = 0.1
 time = 0.2
-velocity = distance / (time / 10)
-
-# Lists to store time, calculated, and actual values
-time_log = []
-calculated_values = []
-actual_values = []
-
-async def tune_pd_values():
-    global time_log, calculated_values, actual_values
-
-    # Define ranges for kp_scale and kd_scale
-    kp_values = np.linspace(0.01, 2.0, 15)  # Example range for kp
-    kd_values = np.linspace(0.01, 2.0, 15)  # Example range for kd
-
-    best_sse = float('inf')
-    best_kp = 0
-    best_kd = 0
-
-    for kp in kp_values:
-        for kd in kd_values:
-            print(f"Testing kp={kp}, kd={kd}")
-            time_log = []
-            calculated_values = []
-            actual_values = []
 
-            # Run the test with the current kp and kd
-            await run_test(kp, kd)
+# Time, calculated and actual values of the latest test
+telemetry = TelemetryRecorder(1, capacity=len(ma))
 
-            # Calculate SSE
-            sse = sum((np.array(calculated_values) - np.array(actual_values)) ** 2)
-            print(f"SSE for kp={kp}, kd={kd}: {sse:.4f}")
-
-            if sse < best_sse:
-                best_sse = sse
-                best_kp = kp
-                best_kd = kd
-
-    print(f"Optimal PD values: kp={best_kp}, kd={best_kd}, SSE={best_sse:.4f}")
+async def tune_pd_values(strategy=NELDER_MEAD, budget=20):
+    # Warm start from earlier sessions on this joint
+    tuner = PDTuner(run_test, budget=budget, history=load_history("c1"))
+    best_kp, best_kd, best_sse = await tuner.tune(strategy)
+    save_history("c1", tuner.history)
     return best_kp, best_kd
 
 async def run_test(kp_scale, kd_scale):
-    global time_log, calculated_values, actual_values
-    start_time = asyncio.get_event_loop().time()
-
-    # Move to the initial position and wait for completion
-    await c1.set_position_wait_complete(position=ma[0], velocity_limit=20, accel_limit=20)
+    print(f"Testing kp={kp_scale}, kd={kd_scale}")
 
-    for i, position in enumerate(ma):
-        elapsed_time = asyncio.get_event_loop().time() - start_time
-        time_log.append(elapsed_time)
-
-        # Append calculated value
-        calculated_values.append(position)
-
-        # Set the motor position and query feedback
-        result = await c1.set_position(position=position,
-                                       velocity=velocity,
-                                       kd_scale=kd_scale,
-                                       kp_scale=kp_scale,
-                                       watchdog_timeout=math.nan,
-                                       query=True)
-        motor_feedback = result.values.get(1, 0)
-        actual_values.append(motor_feedback)
+    await step_test(get_pool().get(c1_id), kp_scale, kd_scale, positions=ma, step_time=time / 10, telemetry=telemetry)
 
+    for elapsed_time, position, motor_feedback in zip(telemetry.times(), telemetry.targets()[0],
+                                                      telemetry.positions()[0]):
         print(f"Time: {elapsed_time:.2f}s, Target: {position}, Feedback: {motor_feedback:.4f}")
 
-        # Wait for 1 second before moving to the next position
-        await asyncio.sleep((time / 10) * 1)
-
-    # Stop the motor after finishing
-    await c1.set_stop()
+    return telemetry.sse()[0]
 
 async def main():
     # Tune the PD values
@@ -95,8 +45,8 @@ async def main():
 
 def plot_results():
     plt.figure(figsize=(10, 6))
-    plt.plot(time_log, calculated_values, label="Calculated Values", marker='o')
-    plt.plot(time_log, actual_values, label="Actual Values", marker='x')
+    plt.plot(telemetry.times(), telemetry.targets()[0], label="Calculated Values", marker='o')
+    plt.plot(telemetry.times(), telemetry.positions()[0], label="Actual Values", marker='x')
     plt.xlabel("Time (s)")
     plt.ylabel("Position")
     plt.title("Motor Position: Calculated vs Actual")
@@ -1,19 +1,19 @@
 import asyncio
-import moteus
 import math
 
+from Xbox_controller.controller_pool import get_pool
+from Xbox_controller.dispatch import set_positions_wait_complete, set_stops
+
 async def main():
-    # Construct a default controller at id 1.
-    c1 = moteus.Controller(1)
-    c2 = moteus.Controller(2)
+    # Controllers 1 and 2 on the shared transport
+    c1, c2 = get_pool().controllers(1, 2)
 
-    await c1.set_position_wait_complete(position=0, accel_limit=10, watchdog_timeout=math.nan)
-    await c2.set_position_wait_complete(position=0, accel_limit=10, watchdog_timeout=math.nan)
+    # Move both to zero together, then stop both in one cycle
+    await set_positions_wait_complete([c1, c2], [0, 0], accel_limit=10, watchdog_timeout=math.nan)
 
     await asyncio.sleep(1)
 
-    await c1.set_stop()
-    await c2.set_stop()
+    await set_stops([c1, c2])
 
 if __name__ == '__main__':
     asyncio.run(main())
\ No newline at end of file
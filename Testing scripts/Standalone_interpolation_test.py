@@ -2,6 +2,9 @@ import moteus
 import math
 import asyncio
 import matplotlib.pyplot as plt
+from Xbox_controller.telemetry import TelemetryRecorder
+from Xbox_controller.live_plot import LivePlot
+from Xbox_controller.query_profiles import profile, POSITION
 
 # Initialize the controller
 c1 = moteus.Controller(1)
@@ -13,13 +16,13 @@ distance = 0.1
 time = 1
 velocity = d / (time / 10)
 
-# Lists to store time, calculated, and actual values
-time_log = []
-calculated_values = []
-actual_values = []
+# Time, calculated and actual values
+telemetry = TelemetryRecorder(1, capacity=len(ma))
+
+# Watch the run live in a separate window
+live_plot = True
 
 async def main():
-    global time_log, calculated_values, actual_values
     start_time = asyncio.get_event_loop().time()
 
     for i in range(len(ma) - 1):
@@ -27,15 +30,13 @@ async def main():
         n = array[i + 1]
         d = round(n - f, 5)
 
+    live = LivePlot(joints=1).start() if live_plot else None
+
     # Move to the initial position and wait for completion
     await c1.set_position_wait_complete(position=ma[0], velocity_limit=10, accel_limit=10)
 
     for i, position in enumerate(ma):
         elapsed_time = asyncio.get_event_loop().time() - start_time
-        time_log.append(elapsed_time)
-
-        # Append calculated value
-        calculated_values.append(position)
 
         # Set the motor position and query feedback
         result = await c1.set_position(position=position,
@@ -43,9 +44,11 @@ async def main():
                                        kd_scale=2,
                                        kp_scale=0.4,
                                        watchdog_timeout=math.nan,
-                                       query=True)
-        motor_feedback = result.values.get(1, 0)
-        actual_values.append(motor_feedback)
+                                       query_override=profile(POSITION))
+        telemetry.record_results(elapsed_time, position, result)
+        if live is not None:
+            live.record_results(elapsed_time, position, result)
+        motor_feedback = result.values[1]
 
         print(f"Time: {elapsed_time:.2f}s, Target: {position}, Feedback: {motor_feedback:.4f}")
 
@@ -54,14 +57,16 @@ async def main():
 
     # Stop the motor after finishing
     await c1.set_stop()
+    if live is not None:
+        live.close()
 
     # Plot the results
     plot_results()
 
 def plot_results():
     plt.figure(figsize=(10, 6))
-    plt.plot(time_log, calculated_values, label="Calculated Values", marker='o')
-    plt.plot(time_log, actual_values, label="Actual Values", marker='x')
+    plt.plot(telemetry.times(), telemetry.targets()[0], label="Calculated Values", marker='o')
+    plt.plot(telemetry.times(), telemetry.positions()[0], label="Actual Values", marker='x')
     plt.xlabel("Time (s)")
     plt.ylabel("Position")
     plt.title("Motor Position: Calculated vs Actual")
@@ -1,9 +1,16 @@
 import asyncio
 import math
-import moteus
+import time
 import matplotlib.pyplot as plt
-from Xbox_controller.ik_equations import calculate_motor_positions
-from Xbox_controller.interpolate_points import interpolate_coordinates  # Import the new interpolation function
+from Xbox_controller.ramp import SINUSOIDAL_INOUT
+from Xbox_controller.trajectory import compile_trajectory, TrajectoryStreamer
+from Xbox_controller.scheduler import FixedRateLoop
+from Xbox_controller.controller_pool import get_pool
+from Xbox_controller.dispatch import set_positions, set_stops
+from Xbox_controller.query_profiles import profile, POSITION
+from Xbox_controller.telemetry import TelemetryRecorder
+from Xbox_controller.telemetry_log import TelemetryLog
+from Xbox_controller.live_plot import LivePlot
 
 # Velocity and acceleration parameters sent to Moteus
 acceleration = 20
@@ -11,14 +18,15 @@ velocity_limit = 25
 kp = 1
 kd = 1
 
-# Adjust how quickly each segment is traversed (seconds per unit distance)
-time_per_unit_distance = 1.0
+# Interpolation steps per segment and time between steps (seconds)
+num_steps = 200
+step_time = 0.02
 
-# A scaling factor that dictates how many interpolation steps you take per unit distance
-steps_scale = 75
+# Watch targets and feedback while the square runs
+live_plot = True
 
-c1 = moteus.Controller(1)
-c2 = moteus.Controller(2)
+# Send the joint velocities of the path with each position target
+velocity_feedforward = True
 
 # Predefined list of coordinates within the range of 1 to -1 for both x and y
 coordinates = [
@@ -29,93 +37,62 @@ coordinates = [
     (50.0, 50.0)     # Back to top-right corner to close the square
 ]
 
-# Storage for motor target positions, feedback positions, time, and XY coordinates
-time_log = []
-motor1_targets = []
-motor2_targets = []
-motor1_feedback = []
-motor2_feedback = []
-interpolated_x = []
-interpolated_y = []
-
 async def main():
-    # Clear any outstanding faults (with query to verify status if needed)
-    await c1.set_stop(query=True)
-    await c2.set_stop(query=True)
+    c1, c2 = get_pool().controllers(1, 2)
 
-    global time_log, motor1_targets, motor2_targets, motor1_feedback, motor2_feedback
-    time_log.clear()
-    motor1_targets.clear()
-    motor2_targets.clear()
-    motor1_feedback.clear()
-    motor2_feedback.clear()
-    interpolated_x.clear()
-    interpolated_y.clear()
-
-    current_time = 0.0
+    # Clear any outstanding faults (with query to verify status if needed)
+    await set_stops([c1, c2], query=True)
+
+    # Interpolate the whole square and solve IK for it up front
+    trajectory = compile_trajectory(coordinates, num_steps, SINUSOIDAL_INOUT, dt=step_time)
+
+    # Motor targets and feedback for both joints, sized for the whole run,
+    # and streamed to a log file for later analysis (telemetry_log.py)
+    log = TelemetryLog(f"square-{time.strftime('%Y%m%d-%H%M%S')}.tlm", joints=[c1.id, c2.id],
+                       mode="SINUSOIDAL_INOUT", num_steps=num_steps, step_time=step_time, kp=kp, kd=kd,
+                       velocity_feedforward=velocity_feedforward)
+    telemetry = TelemetryRecorder(2, capacity=2 * len(trajectory), log=log)
+    live = LivePlot(joints=2).start() if live_plot else None
+
+    streamer = TrajectoryStreamer(trajectory)
+
+    async def tick():
+        # Playback only indexes the precomputed arrays
+        m1, m2 = streamer.sample()
+        v1, v2 = streamer.velocity() if velocity_feedforward else (None, None)
+
+        # Command both motors in one transport cycle
+        result1, result2 = await set_positions(
+            [c1, c2], [m1, m2],
+            velocity=[v1, v2],
+            velocity_limit=velocity_limit,
+            accel_limit=acceleration,
+            kp_scale=kp,
+            kd_scale=kd,
+            watchdog_timeout=math.nan,
+            query_override=profile(POSITION)  # Retrieve position feedback only
+        )
+
+        # Log targets and feedback
+        telemetry.record_results(trajectory.t[streamer.index], (m1, m2), (result1, result2))
+        if live is not None:
+            live.record_results(trajectory.t[streamer.index], (m1, m2), (result1, result2))
+
+        if streamer.isFinished():
+            return False
 
     try:
-        # Loop through the coordinates
-        for i in range(len(coordinates) - 1):
-            p1 = coordinates[i]
-            p2 = coordinates[i + 1]
-
-            # Determine how many interpolation steps
-            num_steps = 200
-
-            # Use the imported interpolate_coordinates function
-            interpolated_points = await interpolate_coordinates(p1, p2, num_steps, mode="sinusoidal")
-
-            for target_x, target_y in interpolated_points:
-                # Store the interpolated coordinates for plotting
-                interpolated_x.append(target_x)
-                interpolated_y.append(target_y)
-
-                # Compute inverse kinematics
-                angles = await calculate_motor_positions(target_x, target_y)
-                if angles is not None:
-                    m1, m2 = angles
-
-                    # Log target positions
-                    time_log.append(current_time)
-                    motor1_targets.append(m1)
-                    motor2_targets.append(m2)
-
-                    # Command the motors
-                    result1 = await c1.set_position(
-                        position=m1,
-                        velocity_limit=velocity_limit,
-                        accel_limit=acceleration,
-                        kp_scale=kp,
-                        kd_scale=kd,
-                        watchdog_timeout=math.nan,
-                        query=True  # Retrieve feedback
-                    )
-                    result2 = await c2.set_position(
-                        position=m2,
-                        velocity_limit=velocity_limit,
-                        accel_limit=acceleration,
-                        kp_scale=kp,
-                        kd_scale=kd,
-                        watchdog_timeout=math.nan,
-                        query=True  # Retrieve feedback
-                    )
-
-                    # Log feedback positions (Key 1 is position in Moteus)
-                    motor1_feedback.append(result1.values.get(1, 0))
-                    motor2_feedback.append(result2.values.get(1, 0))
-
-                # Update time and sleep so each segment lasts 'segment_time'
-                time_per_step = 2 / (num_steps if num_steps > 0 else 1)
-                current_time += time_per_step
-                await asyncio.sleep(0.02)
+        await FixedRateLoop(1 / step_time).run(tick)
 
         print("Completed one full loop of the square.")
+        print(f"SSE per motor: {telemetry.sse()}, max error: {telemetry.max_error()}")
 
     finally:
         # Ensure motors are stopped
-        await c1.set_stop()
-        await c2.set_stop()
+        await set_stops([c1, c2])
+        log.close()
+        if live is not None:
+            live.close()
         print("Cleaning up and stopping the motors.")
 
         # Plot the results
@@ -123,10 +100,13 @@ async def main():
 
         # Plot motor targets and feedback positions
         plt.subplot(2, 1, 1)
-        plt.plot(time_log, motor1_targets, label="Motor 1 Target", linestyle="--")
-        plt.plot(time_log, motor2_targets, label="Motor 2 Target", linestyle="--")
-        plt.plot(time_log, motor1_feedback, label="Motor 1 Feedback", alpha=0.7)
-        plt.plot(time_log, motor2_feedback, label="Motor 2 Feedback", alpha=0.7)
+        time_log = telemetry.times()
+        targets = telemetry.targets()
+        feedback = telemetry.positions()
+        plt.plot(time_log, targets[0], label="Motor 1 Target", linestyle="--")
+        plt.plot(time_log, targets[1], label="Motor 2 Target", linestyle="--")
+        plt.plot(time_log, feedback[0], label="Motor 1 Feedback", alpha=0.7)
+        plt.plot(time_log, feedback[1], label="Motor 2 Feedback", alpha=0.7)
         plt.xlabel("Time (s)")
         plt.ylabel("Motor Position (rev or rad)")
         plt.title("Motor Target vs Feedback Positions Over Time")
@@ -135,7 +115,7 @@ async def main():
 
         # Plot the interpolated x and y coordinates
         plt.subplot(2, 1, 2)
-        plt.plot(interpolated_x, interpolated_y, label="Interpolated Path", color="blue")
+        plt.plot(trajectory.x, trajectory.y, label="Interpolated Path", color="blue")
         plt.scatter(*zip(*coordinates), color="red", label="Waypoints", zorder=5)
         plt.xlabel("X Coordinate")
         plt.ylabel("Y Coordinate")
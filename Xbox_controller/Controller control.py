@@ -1,63 +1,95 @@
 import asyncio
-import pygame
-import moteus
-from Homing_sequence_function import home_motor
-from ik_equations import calculate_motor_positions
+
+# Start with `python cli.py teleop` from the repository root, which puts
+# the root on sys.path for the Xbox_controller.* imports below
+from Xbox_controller.controller_pool import ControllerPool, get_pool, set_pool
+from Xbox_controller.Homing_sequence_function import home_motor_cached, home_motors, home_motors_cached
+from Xbox_controller.ik_equations import calculate_motor_positions
+from Xbox_controller.scheduler import FixedRateLoop, SKIP
+from Xbox_controller.joystick_input import JoystickReader
 
 x_scale_factor = 70
 y_scale_factor = 70
+control_rate = 100  # Hz
+
+# Groups of joints (controller ids) that must not move at the same time
+# while homing, e.g. [(1, 2)] if one joint's travel can hit the other.
+# The two leg motors drive separate links, so both home at once.
+homing_interlock = ()
+
+# Home the joints at start-up: one limit touch per joint against the
+# cached calibration, full homing for joints where that fails
+home_on_start = True
 
-c1 = moteus.Controller(1)
-c2 = moteus.Controller(2)
+# Drive simulated joints instead of the CAN bus
+simulate = False
 
 async def main():
+    if simulate:
+        set_pool(ControllerPool.simulated())
+
+    # Same controller instances (and transport) as the IK module
+    c1, c2 = get_pool().controllers(1, 2)
+
     # Clear any outstanding faults
     await c1.set_stop()
     await c2.set_stop()
 
-    try:
-        while True:
-            # Initialize Pygame and the joystick
-            pygame.init()
-            joystick = pygame.joystick.Joystick(0)
-            joystick.init()
+    if home_on_start:
+        await home_motors_cached([c1, c2], interlock=homing_interlock)
+
+    # Joystick is initialized once and polled on its own thread
+    joystick = JoystickReader(0).start()
+
+    async def tick():
+        # Buttons pressed since the last tick
+        pressed = joystick.get_pressed()
 
-            pygame.event.pump()
+        # Exit the loop if button 0 is pressed
+        if 2 in pressed:
+            print("Button 0 pressed. Stopping motor...")
+            return False
 
-            # Exit the loop if button 0 is pressed
-            if joystick.get_button(2):
-                print("Button 0 pressed. Stopping motor...")
-                break
+        # Homing sequence for all motors
+        if 3 in pressed:
+            await home_motors([c1, c2], interlock=homing_interlock)
 
-            # Homing sequence for motors
-            if joystick.get_button(4):
-                await c1.set_stop()
-                await asyncio.sleep(0.5)
-                await home_motor(c2)
+        # Homing sequence for motors
+        if 4 in pressed:
+            await c1.set_stop()
+            await asyncio.sleep(0.5)
+            await home_motor_cached(c2)
 
-            if joystick.get_button(5):
-                await c2.set_stop()
-                await asyncio.sleep(0.5)
-                await home_motor(c1)
+        if 5 in pressed:
+            await c2.set_stop()
+            await asyncio.sleep(0.5)
+            await home_motor_cached(c1)
 
-            # if joystick.get_button(1):
-                await calculate_motor_positions(0, -50)
+        # if joystick.snapshot().buttons[1]:
+            await calculate_motor_positions(0, -50)
 
-            # else:
-                await calculate_motor_positions(0, 0)
+        # else:
+            await calculate_motor_positions(0, 0)
 
-            # target_x = joystick.get_axis(2) * x_scale_factor
-            # target_y = -joystick.get_axis(3) * y_scale_factor
+        # state = joystick.snapshot()
+        # target_x = state.axes[2] * x_scale_factor
+        # target_y = -state.axes[3] * y_scale_factor
 
-            # Calculate joint angles function
-            # await calculate_motor_positions(target_x, target_y)
+        # Calculate joint angles function
+        # await calculate_motor_positions(target_x, target_y)
 
-            await asyncio.sleep(0.01)  # Small sleep interval for better performance
+    # Run the tick at a fixed rate against absolute deadlines
+    loop = FixedRateLoop(control_rate, SKIP)
+
+    try:
+        await loop.run(tick)
 
     finally:
+        joystick.stop()
         await c1.set_stop()
         await c2.set_stop()
         print("Cleaning up and stopping the motors.")
+        print(loop.report())
 
 if __name__ == '__main__':
     asyncio.run(main())
@@ -1,58 +1,146 @@
 import asyncio
+import json
+import math
+import os
+import time
+from collections import deque, namedtuple
+
+from Xbox_controller.dispatch import cycle, set_stops
+from Xbox_controller.query_profiles import profile, POSITION_TORQUE, KINEMATICS, HOME_STATE
 
 resistance_threshold = 0.6
 torque_limit = 0.4
 out_degrees = 140
 process_sleep = 0.5
 
-async def home_motor(controller):
+# Homing modes
+SINGLE_SPEED = 0x00  # one pass at 1 rev/s, stop when torque crosses the threshold
+TWO_SPEED = 0x01     # fast approach, back off, slow re-touch, stall detection
+
+homing_mode = TWO_SPEED
+fast_speed = 3.0        # rev/s, first approach
+slow_speed = 0.25       # rev/s, re-touch that sets the limit
+backoff_distance = 0.1  # rev, moved away from the stop between the two
+poll_period = 0.005     # s, feedback is read at this fixed rate
+
+# Stall detection: torque up and velocity down, both low-pass filtered,
+# for stall_samples polls in a row
+stall_filter = 0.3      # weight of each new sample
+stall_velocity = 0.05   # rev/s
+stall_samples = 3
+
+# Bounded log of homing feedback: (time, direction, position, velocity, torque)
+homing_log = deque(maxlen=5000)
+
+# Calibration cache (see home_motor_cached)
+calibration_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "homing_calibration.json")
+verify_tolerance = 0.02  # rev, allowed difference between the touch and the cached limit
+
+# moteus home state once the output position has been set (set_output_exact)
+OUTPUT_HOMED = 2
+
+HomingResult = namedtuple("HomingResult", ["pos_limit", "neg_limit", "midpoint", "travel"])
+
+
+class _LimitDetector:
+    """
+    Decides when a seek has reached the stop. With stall detection:
+    filtered torque up and filtered velocity down for stall_samples
+    polls in a row; without: raw torque over the threshold.
+    """
+    def __init__(self, direction, speed, stall_detection):
+        self.stall_detection = stall_detection
+        self.filtered_torque = 0.0
+        self.filtered_velocity = direction * speed
+        self.stalled = 0
+
+    def update(self, torque, velocity):
+        if not self.stall_detection:
+            return abs(torque) > torque_limit * resistance_threshold
 
-    async def find_limit(direction):
-        print(f"Starting to find limit in direction: {direction}")
-        position = None
+        self.filtered_torque += stall_filter * (torque - self.filtered_torque)
+        self.filtered_velocity += stall_filter * (velocity - self.filtered_velocity)
+        if (abs(self.filtered_torque) > torque_limit * resistance_threshold and
+                abs(self.filtered_velocity) < stall_velocity):
+            self.stalled += 1
+        else:
+            self.stalled = 0
+        return self.stalled >= stall_samples
 
-        try:
-            while True:
-                # Send command to move the motor
-                result = await controller.set_position(
-                    position=float('nan'),  # Free position control
-                    velocity=direction * 1,  # Small constant velocity
-                    maximum_torque=torque_limit,  # Torque limit
-                    query=True,  # Request feedback
-                )
 
-                # Extract feedback values
+async def seek(controller, direction, speed, stall_detection):
+    detector = _LimitDetector(direction, speed, stall_detection)
+    deadline = time.monotonic()
+    # Stall detection also watches velocity
+    query = profile(KINEMATICS if stall_detection else POSITION_TORQUE)
 
-                torque = result.values.get(3, 0)  # Torque corresponds to key 3
-                current_position = result.values.get(1, 0)  # Position corresponds to key 1
+    while True:
+        # Send command to move the motor
+        result = await controller.set_position(
+            position=float('nan'),  # Free position control
+            velocity=direction * speed,  # Constant velocity
+            maximum_torque=torque_limit,  # Torque limit
+            query_override=query,  # Request feedback
+        )
 
-                print(f"Position: {current_position:.4f}, Torque: {torque:.4f}")
+        # Extract feedback values; velocity is only queried for stall detection
+        torque = result.values[3]  # Torque corresponds to key 3
+        current_position = result.values[1]  # Position corresponds to key 1
+        velocity = result.values[2] if stall_detection else math.nan  # Velocity corresponds to key 2
 
-                # Check for resistance based on the torque
-                if abs(torque) > torque_limit * resistance_threshold:
-                    print("Resistance encountered!")
-                    position = current_position
-                    break
-        except Exception as e:
-            print(f"Error: {e}")
-        finally:
-            # Stop the motor after the loop completes or is interrupted
-            await controller.set_stop()
-            await asyncio.sleep(process_sleep)
+        homing_log.append((time.monotonic(), direction, current_position, velocity, torque))
 
-        return position
+        # Check for resistance
+        if detector.update(torque, velocity):
+            return current_position
+
+        deadline += poll_period
+        await asyncio.sleep(max(deadline - time.monotonic(), 0))
+
+async def find_limit(controller, direction, mode):
+    print(f"Starting to find limit in direction: {direction}")
+    position = None
+
+    try:
+        if mode == TWO_SPEED:
+            # Fast approach, back off, then touch again slowly
+            touch = await seek(controller, direction, fast_speed, True)
+            await controller.set_position_wait_complete(
+                position=touch - direction * backoff_distance,
+                velocity_limit=fast_speed, query=True)
+            position = await seek(controller, direction, slow_speed, True)
+        else:
+            position = await seek(controller, direction, 1, False)
+        print(f"Resistance encountered at {position:.4f}")
+    except Exception as e:
+        print(f"Error: {e}")
+    finally:
+        # Stop the motor after the loop completes or is interrupted
+        await controller.set_stop()
+        await asyncio.sleep(process_sleep)
+
+    return position
+
+
+async def home_motor(controller, mode=None, path=None):
+    """
+    Full homing; the result is saved to the calibration file at path
+    (default: calibration_path).
+    """
+    if mode is None:
+        mode = homing_mode
 
     # Set stop to clear any existing errors
-    await controller.set_stop()
+    boot_frame = (await boot_frames([controller]))[controller.id]
     await asyncio.sleep(process_sleep)  # Give it time to stop
 
     # Finding positive limit
     print("Finding positive limit...")
-    pos_limit = await find_limit(direction=1)
+    pos_limit = await find_limit(controller, direction=1, mode=mode)
 
     # Finding negative limit
     print("Finding negative limit...")
-    neg_limit = await find_limit(direction=-1)
+    neg_limit = await find_limit(controller, direction=-1, mode=mode)
 
     if pos_limit is not None and neg_limit is not None:
         # Print the positions found
@@ -66,15 +154,346 @@ async def home_motor(controller):
         # Move to midpoint using set_position_wait_complete
         midpoint = (pos_limit + neg_limit) / 2
         print(f"Midpoint calculated: {midpoint:.4f}")
-        print("Moving motor to midpoint...")
-        await controller.set_position_wait_complete(position=midpoint, velocity_limit=1, query=True)
-        print("Motor at midpoint.")
-        await controller.set_stop()
+        await move_to_midpoint(controller, midpoint)
 
-        await controller.set_output_exact()
-
-        # Find the gear ratio
-#        gearratio = (position_difference * 360) / out_degrees
-#        print(f"Gear ratio: {gearratio:.4f}")
+        result = HomingResult(pos_limit, neg_limit, midpoint, position_difference)
+        save_calibration(controller.id, result, path, boot_frame)
+        return result
     else:
         print("Failed to determine limits.")
+        return None
+
+
+async def move_to_midpoint(controller, midpoint):
+    print("Moving motor to midpoint...")
+    await controller.set_position_wait_complete(position=midpoint, velocity_limit=1, query=True)
+    print("Motor at midpoint.")
+    await controller.set_stop()
+
+    # set the zero position at the mid point
+    await controller.set_output_exact()
+
+
+# ----------------------------------------------------------------
+# Calibration cache. Every full homing stores the limits, midpoint,
+# travel, the gear ratio measured from the travel and a timestamp,
+# keyed by controller id, and whether the limits were measured in the
+# power-up frame. home_motor_cached() then only touches the positive
+# limit once and compares the touch with the one position the limit
+# must be at in the controller's current frame:
+#
+#   power-up frame (home state 0): the cached limit, if it was also
+#       measured in the power-up frame
+#   output set (home state 2): +travel/2, since move_to_midpoint()
+#       zeroed the output at the midpoint earlier in this power cycle
+#
+# On a match the cached travel gives the midpoint and the rest of the
+# sweep is skipped. Otherwise it does a full home_motor(). This relies
+# on the position at power-up being repeatable, as it is for the
+# relative encoders here.
+# ----------------------------------------------------------------
+async def boot_frames(controllers):
+    """
+    Stops the controllers and returns {controller id: True} for those
+    still in the power-up frame, False once the output position has been
+    set (or if there was no reply).
+    """
+    replies = await set_stops(controllers, query_override=profile(HOME_STATE))
+    return {c.id: r is not None and r.values[0x00c] != OUTPUT_HOMED  # Home state corresponds to key 0x00c
+            for c, r in zip(controllers, replies)}
+
+
+def load_calibration(path=None):
+    try:
+        with open(path or calibration_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_calibration(controller_id, result, path=None, boot_frame=False):
+    calibration = load_calibration(path)
+    calibration[str(controller_id)] = {
+        "boot_frame": boot_frame,
+        "pos_limit": result.pos_limit,
+        "neg_limit": result.neg_limit,
+        "midpoint": result.midpoint,
+        "travel": result.travel,
+        "gear_ratio": (result.travel * 360) / out_degrees,
+        "timestamp": time.time(),
+    }
+    with open(path or calibration_path, "w") as f:
+        json.dump(calibration, f, indent=2, sort_keys=True)
+
+
+async def home_motor_cached(controller, mode=None, path=None, fallback=True):
+    """
+    Homing from the cached calibration with one limit touch. When there
+    is no usable cache, or the touch does not match it, runs a full
+    home_motor(), or returns None with fallback=False.
+    """
+    if mode is None:
+        mode = homing_mode
+
+    async def full_homing():
+        return await home_motor(controller, mode, path) if fallback else None
+
+    cached = load_calibration(path).get(str(controller.id))
+    if cached is None:
+        print("No cached calibration, running full homing.")
+        return await full_homing()
+
+    # Set stop to clear any existing errors
+    boot_frame = (await boot_frames([controller]))[controller.id]
+    await asyncio.sleep(process_sleep)
+
+    travel = cached["travel"]
+    if not boot_frame:
+        expected = travel / 2
+    elif cached.get("boot_frame"):
+        expected = cached["pos_limit"]
+    else:
+        print("Cached limits are not in the power-up frame, running full homing.")
+        return await full_homing()
+
+    print("Verifying cached calibration...")
+    pos_limit = await find_limit(controller, direction=1, mode=mode)
+
+    if pos_limit is None or abs(pos_limit - expected) > verify_tolerance:
+        print("Cached calibration does not match, running full homing.")
+        return await full_homing()
+
+    midpoint = pos_limit - travel / 2
+    print(f"Calibration verified, midpoint: {midpoint:.4f}")
+    await move_to_midpoint(controller, midpoint)
+
+    result = HomingResult(pos_limit, pos_limit - travel, midpoint, travel)
+    if boot_frame:
+        # Refresh the timestamp
+        save_calibration(controller.id, result, path, boot_frame)
+    return result
+
+
+async def home_motors_cached(controllers, interlock=(), mode=None, path=None):
+    """
+    Start-up homing: home_motor_cached() for each joint in turn, then
+    home_motors() for every joint whose cache was missing or did not
+    match, all together. Returns {controller id: HomingResult}, with
+    None for joints that failed.
+    """
+    results = {}
+    unverified = []
+    for c in controllers:
+        results[c.id] = await home_motor_cached(c, mode, path, fallback=False)
+        if results[c.id] is None:
+            unverified.append(c)
+    if unverified:
+        results.update(await home_motors(unverified, interlock, mode=mode, path=path))
+    return results
+
+
+# ----------------------------------------------------------------
+# Concurrent homing. home_motors() runs the same sequence as
+# home_motor() (positive limit, negative limit, move to midpoint,
+# zero there) as one small state machine per joint, and sends the
+# commands of all joints together in one transport cycle per tick.
+# Each limit is found like find_limit() does it, in the same mode:
+# TWO_SPEED goes through the approach, back-off and re-touch phases
+# with the same stall detector.
+#
+# interlock lists groups of coupled joints (by controller id) that
+# must not move at the same time; within a group the joints home one
+# after another, in the order they were given.
+# ----------------------------------------------------------------
+
+# Homing states
+WAITING = 0x00
+PAUSED = 0x01
+SEEK_POSITIVE = 0x02
+SEEK_NEGATIVE = 0x03
+TO_MIDPOINT = 0x04
+DONE = 0x05
+FAILED = 0x06
+
+# Seek phases (TWO_SPEED; SINGLE_SPEED only uses APPROACH)
+APPROACH = 0x00
+BACK_OFF = 0x01
+RETOUCH = 0x02
+
+midpoint_tolerance = 0.01  # rev, how close counts as "at midpoint"
+
+
+class _JointHoming:
+    def __init__(self, controller, mode):
+        self.controller = controller
+        self.mode = mode
+        self.state = WAITING
+        self.after_pause = None
+        self.pause_until = 0.0
+        self.started = 0.0
+        self.pending = []  # commands to send with the next cycle
+        self.phase = APPROACH
+        self.detector = None
+        self.touch = None
+        self.pos_limit = None
+        self.neg_limit = None
+        self.midpoint = None
+
+    def active(self):
+        return self.state not in (WAITING, DONE, FAILED)
+
+    def start(self, now):
+        self.started = now
+        self.pause(SEEK_POSITIVE, now)
+
+    def pause(self, next_state, now):
+        # Same stop-and-settle as home_motor()
+        self.state = PAUSED
+        self.after_pause = next_state
+        self.pause_until = now + process_sleep
+        self.pending.append(self.controller.make_stop())
+        if next_state in (SEEK_POSITIVE, SEEK_NEGATIVE):
+            self._set_phase(APPROACH, 1 if next_state == SEEK_POSITIVE else -1)
+
+    def fail(self):
+        self.state = FAILED
+        self.pending.append(self.controller.make_stop())
+
+    def _set_phase(self, phase, direction):
+        self.phase = phase
+        if phase == APPROACH:
+            self.detector = _LimitDetector(direction, self._speed(), self.mode == TWO_SPEED)
+        elif phase == RETOUCH:
+            self.detector = _LimitDetector(direction, slow_speed, True)
+
+    def _speed(self):
+        if self.mode != TWO_SPEED:
+            return 1
+        return fast_speed if self.phase == APPROACH else slow_speed
+
+    def _backoff_target(self, direction):
+        return self.touch - direction * backoff_distance
+
+    def command(self):
+        c = self.controller
+        if self.state == SEEK_POSITIVE or self.state == SEEK_NEGATIVE:
+            direction = 1 if self.state == SEEK_POSITIVE else -1
+            if self.phase == BACK_OFF:
+                return c.make_position(position=self._backoff_target(direction), velocity_limit=fast_speed,
+                                       query_override=profile(KINEMATICS))
+            # Stall detection also watches velocity
+            query = profile(KINEMATICS if self.detector.stall_detection else POSITION_TORQUE)
+            return c.make_position(position=float('nan'), velocity=direction * self._speed(),
+                                   maximum_torque=torque_limit, query_override=query)
+        if self.state == TO_MIDPOINT:
+            return c.make_position(position=self.midpoint, velocity_limit=1, query_override=profile(KINEMATICS))
+        return None
+
+    def handle(self, result, now):
+        # Read only what the profile sent in command() carries
+        position = result.values[1]  # Position corresponds to key 1
+
+        if self.state == SEEK_POSITIVE or self.state == SEEK_NEGATIVE:
+            direction = 1 if self.state == SEEK_POSITIVE else -1
+            if self.phase == BACK_OFF:
+                velocity = result.values[2]  # Velocity corresponds to key 2
+                # Backed off: touch the stop again, slowly
+                if (abs(position - self._backoff_target(direction)) < midpoint_tolerance and
+                        abs(velocity) < stall_velocity):
+                    self._set_phase(RETOUCH, direction)
+                return
+
+            torque = result.values[3]  # Torque corresponds to key 3
+            velocity = result.values[2] if self.detector.stall_detection else math.nan
+            homing_log.append((now, direction, position, velocity, torque))
+            if not self.detector.update(torque, velocity):
+                return
+            if self.mode == TWO_SPEED and self.phase == APPROACH:
+                self.touch = position
+                self._set_phase(BACK_OFF, direction)
+            elif self.state == SEEK_POSITIVE:
+                self.pos_limit = position
+                self.pause(SEEK_NEGATIVE, now)
+            else:
+                self.neg_limit = position
+                self.midpoint = (self.pos_limit + self.neg_limit) / 2
+                self.pause(TO_MIDPOINT, now)
+        elif self.state == TO_MIDPOINT:
+            velocity = result.values[2]
+            if abs(position - self.midpoint) < midpoint_tolerance and abs(velocity) < 0.05:
+                # Stop at the midpoint and make it the zero position
+                self.state = DONE
+                self.pending.append(self.controller.make_stop())
+                self.pending.append(self.controller.make_set_output_exact())
+
+    def result(self):
+        if self.state != DONE:
+            return None
+        return HomingResult(self.pos_limit, self.neg_limit, self.midpoint,
+                            self.pos_limit - self.neg_limit)
+
+
+async def home_motors(controllers, interlock=(), period=0.005, timeout=30.0, mode=None, path=None):
+    """
+    Homes every controller concurrently. mode is SINGLE_SPEED or
+    TWO_SPEED (default: homing_mode); results are saved to the
+    calibration file at path. Returns {controller id: HomingResult},
+    with None for joints that failed or timed out.
+    """
+    if mode is None:
+        mode = homing_mode
+    boot_frame = await boot_frames(controllers)
+    joints = [_JointHoming(c, mode) for c in controllers]
+    groups = [set(g) for g in interlock]
+
+    def coupled_busy(j):
+        return any(o is not j and o.active() and o.controller.id in g
+                   for g in groups if j.controller.id in g
+                   for o in joints)
+
+    while True:
+        now = time.monotonic()
+        owners = []
+        commands = []
+        queried = []
+
+        for j in joints:
+            if j.state == WAITING and not coupled_busy(j):
+                j.start(now)
+            elif j.active() and now - j.started > timeout:
+                print(f"Controller {j.controller.id}: homing timed out.")
+                j.fail()
+            elif j.state == PAUSED and now >= j.pause_until:
+                j.state = j.after_pause
+
+            for command in j.pending:
+                owners.append(j.controller)
+                commands.append(command)
+            j.pending = []
+
+            command = j.command() if j.state != PAUSED else None
+            if command is not None:
+                queried.append((j, len(commands)))
+                owners.append(j.controller)
+                commands.append(command)
+
+        if commands:
+            replies = await cycle(owners, commands)
+            for j, index in queried:
+                if replies[index] is not None:
+                    j.handle(replies[index], now)
+
+        if all(j.state in (DONE, FAILED) and not j.pending for j in joints):
+            break
+
+        await asyncio.sleep(period)
+
+    results = {j.controller.id: j.result() for j in joints}
+    for cid, r in results.items():
+        if r is None:
+            print(f"Controller {cid}: failed to determine limits.")
+        else:
+            print(f"Controller {cid}: limits {r.pos_limit:.4f} / {r.neg_limit:.4f}, "
+                  f"travel {r.travel:.4f}, midpoint {r.midpoint:.4f}")
+            save_calibration(cid, r, path, boot_frame[cid])
+    return results
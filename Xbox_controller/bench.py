@@ -0,0 +1,285 @@
+import argparse
+import contextlib
+import fnmatch
+import inspect
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+
+
+# ----------------------------------------------------------------
+# Micro-benchmarks for the per-tick math: ramp_calc for every easing
+# mode, Ramp.update exact (and with a LUT for the LUT_MODES ones),
+# interpolation_x/interpolation_y, the geometry
+# of calculate_motor_positions (motor I/O stubbed out), the gait
+# tick and foot path sampling. Each result is reported as ns/op plus
+# allocation figures from tracemalloc:
+#   peak B/op  - largest transient allocation of one call
+#   blocks/op  - memory blocks still held per call (should be ~0)
+#
+# Run from the repository root, as a module or through cli.py:
+#
+#   python -m Xbox_controller.bench                  run and compare with the baseline
+#   python -m Xbox_controller.bench --save           store the results as the baseline
+#   python -m Xbox_controller.bench -k "ramp_calc*"  only benchmarks matching a pattern
+#   python cli.py bench [...]                        same options
+#
+# Exits with status 1 when any benchmark is slower than its baseline
+# by more than --threshold (default 20%).
+# ----------------------------------------------------------------
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+
+BENCHMARKS = []
+
+
+def benchmark(name):
+    """
+    Registers a setup function that returns the callable to time. A
+    setup that patches anything yields the callable instead and undoes
+    the patches after the yield (in a finally:), once it is measured.
+    """
+    def register(setup):
+        BENCHMARKS.append((name, setup))
+        return setup
+    return register
+
+
+# ----------------------------------------------------------------
+# Benchmarks
+# ----------------------------------------------------------------
+EASING_MODES = [
+    "LINEAR",
+    "QUADRATIC_IN", "QUADRATIC_OUT", "QUADRATIC_INOUT",
+    "CUBIC_IN", "CUBIC_OUT", "CUBIC_INOUT",
+    "QUARTIC_IN", "QUARTIC_OUT", "QUARTIC_INOUT",
+    "QUINTIC_IN", "QUINTIC_OUT", "QUINTIC_INOUT",
+    "SINUSOIDAL_IN", "SINUSOIDAL_OUT", "SINUSOIDAL_INOUT",
+    "EXPONENTIAL_IN", "EXPONENTIAL_OUT", "EXPONENTIAL_INOUT",
+    "CIRCULAR_IN", "CIRCULAR_OUT", "CIRCULAR_INOUT",
+    "ELASTIC_IN", "ELASTIC_OUT", "ELASTIC_INOUT",
+    "BACK_IN", "BACK_OUT", "BACK_INOUT",
+    "BOUNCE_IN", "BOUNCE_OUT", "BOUNCE_INOUT",
+]
+
+
+def _ramp_calc_benchmarks():
+    for name in EASING_MODES:
+        def setup(name=name):
+            from Xbox_controller import ramp
+            m = getattr(ramp, name)
+            return lambda: ramp.ramp_calc(0.37, m)
+        benchmark(f"ramp_calc[{name}]")(setup)
+
+
+_ramp_calc_benchmarks()
+
+
+# Ramp.update on cheap modes, which setLUT() leaves exact, and on the
+# costly ones, exact and with the table
+RAMP_UPDATE_MODES = ["QUADRATIC_INOUT", "SINUSOIDAL_INOUT", "EXPONENTIAL_INOUT", "ELASTIC_OUT", "BACK_INOUT",
+                     "BOUNCE_INOUT"]
+
+
+def _ramp_update_benchmarks():
+    from Xbox_controller import ramp
+
+    for name in RAMP_UPDATE_MODES:
+        for lut in (False, True) if getattr(ramp, name) in ramp.LUT_MODES else (False,):
+            def setup(name=name, lut=lut):
+                m = getattr(ramp, name)
+                r = ramp.Ramp(0)
+                r.setAutomation(False)
+                if lut:
+                    r.setLUT()
+
+                def run():
+                    if r.isFinished():
+                        r.go(100 if r.getValue() < 50 else 0, 1000, m)
+                    r.update()
+                return run
+            benchmark(f"Ramp.update[{name}{', LUT' if lut else ''}]")(setup)
+
+
+_ramp_update_benchmarks()
+
+
+def _interpolation(fn_name):
+    def setup():
+        from Xbox_controller import ramp
+        from Xbox_controller import interpolate_points
+        clock = ramp.ManualClock()
+        interpolate_points.set_clock(clock)
+        fn = getattr(interpolate_points, fn_name)
+        state = [0]
+
+        def run():
+            # Retarget every 100 calls, otherwise step the ramp by 10 ms
+            state[0] += 1
+            clock.advance(10)
+            fn(100 if (state[0] // 100) % 2 else -100, 500)
+        return run
+    return setup
+
+
+benchmark("interpolation_x")(_interpolation("interpolation_x"))
+benchmark("interpolation_y")(_interpolation("interpolation_y"))
+
+
+@benchmark("calculate_motor_positions[no I/O]")
+def _calculate_motor_positions():
+    from Xbox_controller import ik_equations
+    from Xbox_controller.controller_pool import ControllerPool, get_pool, set_pool
+
+    async def no_io(controllers, positions, **kwargs):
+        return [None] * len(controllers)
+
+    def run():
+        # The coroutine never suspends with the stub, so drive it directly
+        try:
+            ik_equations.calculate_motor_positions(10, -50).send(None)
+        except StopIteration:
+            pass
+
+    # Simulated controllers, so no transport is opened, and no sends
+    pool = get_pool()
+    send = ik_equations.set_positions
+    set_pool(ControllerPool.simulated())
+    ik_equations.set_positions = no_io
+    try:
+        yield run
+    finally:
+        ik_equations.set_positions = send
+        set_pool(pool)
+
+
+@benchmark("solve_leg_ik[scalar]")
+def _solve_leg_ik():
+    from Xbox_controller import ik_equations
+    return lambda: ik_equations.solve_leg_ik(10.0, -50.0)
+
+
+@benchmark("GaitGenerator.update[4 legs]")
+def _gait_update():
+    from Xbox_controller import gait
+    g = gait.GaitGenerator()
+    g.set_gait(gait.TROT)
+    return lambda: g.update(0.01)
+
+
+@benchmark("FootPath.sample[step cycle]")
+def _foot_path_sample():
+    from Xbox_controller import spline
+    path = spline.concatenate(spline.line((30, -50), (-30, -50), 0.5),
+                              spline.swing_curve((-30, -50), (30, -50), 30, 0.25))
+    return lambda: path.sample(0.6)
+
+
+# ----------------------------------------------------------------
+# Measurement
+# ----------------------------------------------------------------
+def measure(fn, repeat=5):
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number))
+    ns_per_op = best / number * 1e9
+
+    # Allocations
+    for _ in range(10):
+        fn()
+    tracemalloc.start()
+    start_current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    blocks_before = sys.getallocatedblocks()
+    n = 1000
+    for _ in range(n):
+        fn()
+    blocks = (sys.getallocatedblocks() - blocks_before) / n
+    tracemalloc.stop()
+
+    return {"ns_per_op": ns_per_op, "peak_bytes_per_op": peak - start_current, "blocks_per_op": blocks}
+
+
+def _setup(setup):
+    # Context manager giving the callable of a setup that returns or yields it
+    if inspect.isgeneratorfunction(setup):
+        return contextlib.contextmanager(setup)()
+    return contextlib.nullcontext(setup())
+
+
+def run(pattern="*"):
+    results = {}
+    for name, setup in BENCHMARKS:
+        if not fnmatch.fnmatch(name, pattern):
+            continue
+        try:
+            with _setup(setup) as fn:
+                results[name] = measure(fn)
+        except ImportError as e:
+            print(f"{name:40s} skipped ({e})")
+            continue
+        r = results[name]
+        print(f"{name:40s} {r['ns_per_op']:10.1f} ns/op {r['peak_bytes_per_op']:8d} peak B/op "
+              f"{r['blocks_per_op']:6.2f} blocks/op")
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Prints the change against the baseline; returns the names that
+    regressed by more than threshold.
+    """
+    regressions = []
+    for name, r in results.items():
+        if name not in baseline:
+            continue
+        ratio = r["ns_per_op"] / baseline[name]["ns_per_op"]
+        flag = ""
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:40s} {(ratio - 1) * 100:+7.1f}%{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-tick math micro-benchmarks")
+    parser.add_argument("-k", "--filter", default="*", help="only run benchmarks matching this pattern")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline file")
+    parser.add_argument("--save", action="store_true", help="store the results as the baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    results = run(args.filter)
+
+    if args.save:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline yet; run with --save to create one.")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    print()
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) slower than baseline by more than {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
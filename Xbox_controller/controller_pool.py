@@ -0,0 +1,88 @@
+# ----------------------------------------------------------------
+# Process-wide controller pool. Controllers are created on first use,
+# one instance per id, all on one transport that is discovered and
+# opened once. IK, homing and teleop all take their controllers from
+# here, so they share the instances and the bus connection (and
+# commands for different modules can go out in one dispatch cycle).
+#
+# Nothing is created at import time, and moteus itself is only
+# imported when the first hardware controller is needed.
+#
+#   c1, c2 = get_pool().controllers(1, 2)
+#
+# set_pool(ControllerPool.simulated()) swaps in simulated joints
+# (sim_controller.py) for every module at once.
+# ----------------------------------------------------------------
+
+class ControllerPool:
+    def __init__(self, transport=None, factory=None, **controller_args):
+        """
+        transport: shared transport, discovered on first use if None.
+        factory(id, transport, **controller_args) builds a controller;
+        moteus.Controller by default. controller_args (e.g.
+        query_resolution) are passed to every controller.
+        """
+        self._transport = transport
+        self._factory = factory
+        self._controller_args = controller_args
+        self._controllers = {}
+
+    @classmethod
+    def simulated(cls, dt=None):
+        from Xbox_controller.sim_controller import SimController, SimTransport
+
+        def factory(id, transport):
+            return SimController(id, transport)
+        return cls(SimTransport(dt), factory)
+
+    def transport(self):
+        if self._transport is None:
+            import moteus
+            # moteus' own discovery (fdcanusb, socketcan...), once
+            self._transport = moteus.get_singleton_transport()
+        return self._transport
+
+    def get(self, id):
+        controller = self._controllers.get(id)
+        if controller is None:
+            if self._factory is None:
+                import moteus
+                controller = moteus.Controller(id, transport=self.transport(), **self._controller_args)
+            else:
+                controller = self._factory(id, self.transport(), **self._controller_args)
+            self._controllers[id] = controller
+        return controller
+
+    __getitem__ = get
+
+    def controllers(self, *ids):
+        return [self.get(id) for id in ids]
+
+    def created(self):
+        """
+        Controllers created so far, by id.
+        """
+        return dict(self._controllers)
+
+
+_pool = None
+
+
+def get_pool():
+    """
+    The process-wide pool, created on first call.
+    """
+    global _pool
+    if _pool is None:
+        _pool = ControllerPool()
+    return _pool
+
+
+def set_pool(pool):
+    """
+    Replace the process-wide pool (e.g. with ControllerPool.simulated()).
+    Call before any module has taken controllers from the old one.
+    """
+    global _pool
+    _pool = pool
+    return pool
@@ -0,0 +1,92 @@
+import asyncio
+
+import moteus
+
+
+# ----------------------------------------------------------------
+# Multi-controller dispatch. Instead of awaiting one set_position()
+# per controller (one bus round trip each), build every command with
+# make_position()/make_stop() and send them together in a single
+# Transport.cycle(). Replies come back together as well.
+# ----------------------------------------------------------------
+
+def _transport(controllers, transport):
+    if transport is not None:
+        return transport
+    # Use the transport the controllers already talk through
+    return controllers[0]._get_transport()
+
+
+def _args(kwargs, i):
+    # A list/tuple value gives each controller its own setting
+    return {k: (v[i] if isinstance(v, (list, tuple)) else v) for k, v in kwargs.items()}
+
+
+def _by_controller(controllers, results):
+    # cycle() returns replies in arrival order; hand them back in the
+    # same order as the controllers (None where nothing was returned)
+    by_id = {r.id: r for r in results}
+    return [by_id.get(c.id) for c in controllers]
+
+
+async def cycle(controllers, commands, transport=None):
+    """
+    Send pre-built commands (one per controller) in one transport cycle.
+    """
+    results = await _transport(controllers, transport).cycle(commands)
+    return _by_controller(controllers, results)
+
+
+async def set_positions(controllers, positions, transport=None, query=False, query_override=None, **kwargs):
+    """
+    Command every controller to its entry in positions in one cycle.
+    Other keyword arguments (velocity, accel_limit, kp_scale...) are
+    passed to make_position() for all controllers; pass a list to give
+    each controller its own value. query_override (e.g. a profile from
+    query_profiles) limits the registers each reply carries.
+    """
+    commands = [c.make_position(position=positions[i], query=query, query_override=query_override,
+                                **_args(kwargs, i))
+                for i, c in enumerate(controllers)]
+    return await cycle(controllers, commands, transport)
+
+
+async def set_stops(controllers, transport=None, query=False, query_override=None):
+    """
+    Stop every controller in one cycle.
+    """
+    commands = [c.make_stop(query=query, query_override=query_override) for c in controllers]
+    return await cycle(controllers, commands, transport)
+
+
+async def set_positions_wait_complete(controllers, positions, period_s=0.025, transport=None, **kwargs):
+    """
+    set_position_wait_complete() for several controllers at once: keeps
+    sending all position commands in shared cycles until every controller
+    reports its trajectory complete. Raises moteus.FaultError like the
+    single-controller version.
+    """
+    query = moteus.QueryResolution()
+    query.trajectory_complete = moteus.INT8
+
+    count = 2
+    while True:
+        commands = [c.make_position(position=positions[i], query_override=query, **_args(kwargs, i))
+                    for i, c in enumerate(controllers)]
+        results = await cycle(controllers, commands, transport)
+
+        if all(r is not None for r in results):
+            count = max(count - 1, 0)
+
+            if count == 0 and all(r.values[moteus.Register.TRAJECTORY_COMPLETE] for r in results):
+                return results
+
+        for r in results:
+            if r is None:
+                continue
+            current_mode = r.values.get(moteus.Register.MODE, moteus.Mode.STOPPED)
+            fault_code = r.values.get(moteus.Register.FAULT, 0)
+            if current_mode == moteus.Mode.FAULT or current_mode == moteus.Mode.TIMEOUT:
+                raise moteus.FaultError(current_mode, fault_code)
+
+        await asyncio.sleep(period_s)
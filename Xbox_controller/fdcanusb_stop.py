@@ -0,0 +1,76 @@
+import glob
+import os
+import select
+import termios
+import time
+import tty
+
+
+# ----------------------------------------------------------------
+# Stop frames written straight to an fdcanusb, for `cli.py stop`.
+# moteus, python-can and asyncio together take longer to import than
+# the stop itself; a stop is one fixed 3 byte frame per controller, so
+# this writes the adapter's text protocol directly with the standard
+# library and imports none of them.
+#
+# Only the fdcanusb is handled. With no fdcanusb attached send_stops()
+# returns None and the caller goes through moteus' own transport
+# discovery (pi3hat, socketcan...) as before.
+#
+#   if send_stops([1, 2]) is None:
+#       ...  # fall back to the controller pool
+# ----------------------------------------------------------------
+
+FDCANUSB_GLOB = "/dev/serial/by-id/*fdcanusb*"
+
+# Write one int8 register (0x01): mode (0x000) = stopped (0x00), the
+# frame moteus.Controller.make_stop() builds
+STOP_PAYLOAD = "010000"
+
+
+def stop_command(controller_id, source=0):
+    """
+    fdcanusb line sending a stop to controller_id, CAN-FD with bit rate
+    switch and no reply requested, as moteus sends it.
+    """
+    return f"can send {(source << 8) | controller_id:04x} {STOP_PAYLOAD} BF\n".encode("latin1")
+
+
+def find_fdcanusbs():
+    return sorted(glob.glob(FDCANUSB_GLOB))
+
+
+def send_stops(ids, paths=None, timeout=0.1):
+    """
+    Sends a stop to every id on every fdcanusb (the ids may be on any of
+    them) and waits up to timeout (s) per adapter for it to acknowledge
+    each frame. Returns the number of acknowledged frames, or None when
+    there is no fdcanusb.
+    """
+    paths = find_fdcanusbs() if paths is None else paths
+    if not paths:
+        return None
+    commands = b"".join(stop_command(id) for id in ids)
+    acknowledged = 0
+    for path in paths:
+        fd = os.open(path, os.O_RDWR | os.O_NOCTTY)
+        try:
+            tty.setraw(fd)
+            termios.tcflush(fd, termios.TCIFLUSH)
+            os.write(fd, commands)
+            acknowledged += _wait_ok(fd, len(ids), timeout)
+        finally:
+            os.close(fd)
+    return acknowledged
+
+
+def _wait_ok(fd, count, timeout):
+    # Counts "OK" lines until count arrive or timeout runs out
+    deadline = time.monotonic() + timeout
+    received = b""
+    while received.count(b"OK") < count:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+            break
+        received += os.read(fd, 256)
+    return min(received.count(b"OK"), count)
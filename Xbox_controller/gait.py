@@ -0,0 +1,180 @@
+import math
+
+import numpy as np
+
+from Xbox_controller.ik_equations import solve_leg_ik
+
+
+# ----------------------------------------------------------------
+# Quadruped gait generator. One gait phase (0..1, advanced at the
+# cadence) drives all four legs; each leg runs at its own phase offset.
+# Within a leg's cycle the foot is on the ground for the first `duty`
+# of the cycle, sliding back from +stride/2 to -stride/2 at stand
+# height, and swings forward again along a raised cosine arc of
+# step_height for the rest.
+#
+# Foot positions are in the leg IK frame (mm, x forward, y up), and
+# all legs are evaluated and solved with one solve_leg_ik() call per
+# tick (about 0.1 ms for all eight joints, see bench.py).
+#
+# Switching gait or changing stride/height/cadence blends offsets, duty
+# cycle and amplitude over transition_time, so walk <-> trot <-> stand
+# changes are continuous. STAND brings the amplitude to zero: every
+# foot settles at (stand_x, stand_y).
+#
+#   gait = GaitGenerator()
+#   gait.set_gait(TROT, stride=60, height=30, cadence=1.5)
+#   joints = gait.update(dt)   # (legs, 2) motor positions
+# ----------------------------------------------------------------
+
+# Gaits
+STAND = 0x00
+WALK = 0x01
+TROT = 0x02
+
+# Leg order: front left, front right, rear left, rear right
+LEGS = ("FL", "FR", "RL", "RR")
+
+# Controller ids of the two joints of each leg, in LEGS order
+LEG_IDS = ((1, 2), (3, 4), (5, 6), (7, 8))
+
+# Phase offset per leg and duty cycle of each gait
+GAITS = {
+    STAND: (np.array([0.0, 0.0, 0.0, 0.0]), 1.0),
+    WALK: (np.array([0.0, 0.5, 0.75, 0.25]), 0.75),   # one foot in the air at a time
+    TROT: (np.array([0.0, 0.5, 0.5, 0.0]), 0.5),      # diagonal pairs
+}
+
+
+class GaitGenerator:
+    def __init__(self, stride=60.0, height=30.0, cadence=1.0, stand_x=0.0, stand_y=-50.0,
+                 transition_time=0.5, solver=solve_leg_ik):
+        """
+        stride: foot travel per cycle (mm), height: swing height (mm),
+        cadence: gait cycles per second. solver maps foot positions to
+        motor positions like solve_leg_ik().
+        """
+        self.stand_x = stand_x
+        self.stand_y = stand_y
+        self.transition_time = transition_time
+        self.solver = solver
+
+        self.gait = STAND
+        self.phase = 0.0
+        # Blended parameters: offsets (legs), duty, amplitude, stride, height, cadence
+        self._current = self._parameters(STAND, stride, height, cadence)
+        self._start = self._current.copy()
+        self._target = self._current.copy()
+        self._progress = 1.0
+
+        self.x = np.full(len(LEGS), stand_x)
+        self.y = np.full(len(LEGS), stand_y)
+
+    @staticmethod
+    def _parameters(gait, stride, height, cadence):
+        offsets, duty = GAITS[gait]
+        amplitude = 0.0 if gait == STAND else 1.0
+        # Stand keeps the last walking duty: only the amplitude goes to zero
+        return np.concatenate([offsets, [duty, amplitude, stride, height, cadence]])
+
+    def set_gait(self, gait, stride=None, height=None, cadence=None):
+        """
+        Start a transition to gait, optionally with new parameters.
+        """
+        stride = self._target[-3] if stride is None else stride
+        height = self._target[-2] if height is None else height
+        cadence = self._target[-1] if cadence is None else cadence
+        target = self._parameters(gait, stride, height, cadence)
+        n = len(LEGS)
+        if gait == STAND:
+            # Keep the leg timing of the gait we come from
+            target[:n + 1] = self._target[:n + 1]
+        elif self.gait == STAND and self._current[n + 1] == 0.0:
+            # Starting from rest: take the new timing straight away
+            self._current[:n + 1] = target[:n + 1]
+
+        # Offsets are circular: blend along the shorter way round
+        start = self._current.copy()
+        start[:n] = target[:n] - ((target[:n] - start[:n] + 0.5) % 1.0 - 0.5)
+
+        self.gait = gait
+        self._start = start
+        self._target = target
+        self._progress = 0.0
+
+    def _blend(self, dt):
+        if self._progress >= 1.0:
+            return self._current
+        self._progress = min(1.0, self._progress + dt / self.transition_time if self.transition_time > 0 else 1.0)
+        # Smoothstep, so the blend starts and ends without a kink
+        s = self._progress * self._progress * (3 - 2 * self._progress)
+        self._current = self._start + (self._target - self._start) * s
+        return self._current
+
+    def feet(self, dt):
+        """
+        Advance by dt seconds and return the foot positions (x, y), one
+        entry per leg.
+        """
+        n = len(LEGS)
+        p = self._blend(dt)
+        offsets = p[:n]
+        duty, amplitude, stride, height, cadence = p[n:]
+
+        self.phase = (self.phase + cadence * dt) % 1.0
+        phi = (self.phase + offsets) % 1.0
+
+        # Stance: slide back linearly; swing: raised cosine forward and up
+        stance = phi < duty
+        s = np.where(stance, 0.0, (phi - duty) / max(1.0 - duty, 1e-9))
+        forward = np.where(stance, 0.5 - phi / max(duty, 1e-9), -0.5 * np.cos(np.pi * s))
+        lift = np.where(stance, 0.0, np.sin(np.pi * s))
+
+        self.x = self.stand_x + amplitude * stride * forward
+        self.y = self.stand_y + amplitude * height * lift
+        return self.x, self.y
+
+    def update(self, dt):
+        """
+        Advance by dt seconds; motor positions (legs, 2) for all joints
+        from one batched IK call.
+        """
+        x, y = self.feet(dt)
+        m1, m2 = self.solver(x, y)
+        return np.stack([m1, m2], axis=1)
+
+    def isStanding(self):
+        return self.gait == STAND and self._progress >= 1.0
+
+
+# ----------------------------------------------------------------
+# Running on the bus
+# ----------------------------------------------------------------
+async def run_gait(gait, controllers=None, rate=100, duration=math.inf, **kwargs):
+    """
+    Streams the gait to the leg controllers (default: LEG_IDS from the
+    controller pool) at rate Hz, all joints in one cycle per tick.
+    kwargs go to set_positions (accel_limit, kp_scale...).
+    """
+    from Xbox_controller.controller_pool import get_pool
+    from Xbox_controller.dispatch import set_positions, set_stops
+    from Xbox_controller.scheduler import FixedRateLoop
+
+    if controllers is None:
+        controllers = get_pool().controllers(*[i for leg in LEG_IDS for i in leg])
+    kwargs.setdefault("watchdog_timeout", math.nan)
+    loop = FixedRateLoop(rate)
+    elapsed = [0.0]
+
+    async def tick():
+        joints = gait.update(loop.period)
+        await set_positions(controllers, joints.ravel().tolist(), **kwargs)
+        elapsed[0] += loop.period
+        if elapsed[0] >= duration:
+            return False
+
+    try:
+        await loop.run(tick)
+    finally:
+        await set_stops(controllers)
+    return loop
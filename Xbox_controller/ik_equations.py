@@ -1,19 +1,123 @@
 import math
 import asyncio
-import moteus
+from types import SimpleNamespace
+
+import numpy as np
 
 # These come from the separate library files
-from ramp import Ramp, LINEAR, ONCEFORWARD
-from interpolate_points import interpolation_y, interpolation_x
+from Xbox_controller.ramp import Ramp, LINEAR, ONCEFORWARD
+from Xbox_controller.interpolate_points import interpolation_y, interpolation_x, interpolation_velocity
+from Xbox_controller.dispatch import set_positions
+from Xbox_controller.controller_pool import get_pool
 
-# Two moteus motor controllers for demonstration
-c1 = moteus.Controller(1)
-c2 = moteus.Controller(2)
+# Controller ids of the two leg motors
+LEG_IDS = (1, 2)
 
 # We'll keep track of the "old" filtered Y so it can accumulate
 _filteredY_old = 0.0
 _filteredX_old = 0.0
 
+# Leg geometry
+X_OFFSET = 27.972
+Y_OFFSET = 232.631
+L1, L2 = 150, 180  # link lengths in mm
+THETA1_OFFSET = 147.052  # degrees
+GEAR_REDUCTION = 6
+
+# Send the joint velocities of the foot motion along with each position
+# (False: position targets only, as before)
+velocity_feedforward = True
+
+# Optional IKGrid (ik_grid.py) for the streamed point; None solves exactly
+ik_grid = None
+
+
+# Elementwise functions the geometry below is written with: math for
+# plain numbers (NumPy overhead dominates for one point), NumPy for
+# arrays
+_MATH = SimpleNamespace(acos=math.acos, atan2=math.atan2, sin=math.sin, cos=math.cos, sqrt=math.sqrt,
+                        degrees=math.degrees, maximum=max, clip=lambda v, lo, hi: max(min(v, hi), lo))
+_NUMPY = SimpleNamespace(acos=np.arccos, atan2=np.arctan2, sin=np.sin, cos=np.cos, sqrt=np.sqrt,
+                         degrees=np.degrees, maximum=np.maximum, clip=np.clip)
+
+
+def _functions(xs, ys):
+    if isinstance(xs, (int, float)) and isinstance(ys, (int, float)):
+        return xs, ys, _MATH
+    return np.asarray(xs, dtype=float), np.asarray(ys, dtype=float), _NUMPY
+
+
+def solve_leg_ik(xs, ys):
+    """
+    Inverse kinematics for the two-link leg. xs and ys are foot positions
+    (scalars or NumPy arrays of any matching shape); returns the motor
+    positions (m1, m2) in motor revolutions, with the same shape.
+    """
+    xs, ys, f = _functions(xs, ys)
+
+    # Offsets
+    x = xs - X_OFFSET
+    y = ys - Y_OFFSET
+
+    # Law of cosines for theta2
+    cos_theta2 = (x**2 + y**2 - L1**2 - L2**2) / (2 * L1 * L2)
+    cos_theta2 = f.clip(cos_theta2, -1, 1)  # clamp for safety
+    theta2 = f.acos(cos_theta2)
+
+    # theta1
+    phi = f.atan2(y, x)
+    psi = f.atan2(L2 * f.sin(theta2), L1 + L2 * f.cos(theta2))
+    theta1 = phi - psi
+
+    # Convert angles to motor-friendly positions
+    a1 = f.degrees(theta1) + THETA1_OFFSET
+    a3 = 180 - f.degrees(theta2)
+    a2 = 90 + a1 - a3  # simplified expression
+
+    # Adjust for gear ratio
+    m1 = (a1 / 360.0) * GEAR_REDUCTION
+    m2 = (a2 / 360.0) * GEAR_REDUCTION
+    return m1, m2
+
+
+def leg_jacobian(xs, ys):
+    """
+    Jacobian of solve_leg_ik() at foot positions xs, ys: returns
+    (dm1/dx, dm1/dy, dm2/dx, dm2/dy) in motor revolutions per mm (gear
+    reduction included), each with the shape of xs. Not defined with
+    the leg fully stretched or folded (theta2 = 0 or 180 degrees).
+    """
+    xs, ys, f = _functions(xs, ys)
+
+    x = xs - X_OFFSET
+    y = ys - Y_OFFSET
+    r2 = x**2 + y**2
+
+    # theta2 = acos((r2 - L1^2 - L2^2) / (2 L1 L2))
+    cos_theta2 = f.clip((r2 - L1**2 - L2**2) / (2 * L1 * L2), -1, 1)
+    sin_theta2 = f.maximum(f.sqrt(1 - cos_theta2**2), 1e-9)
+    dt2_dx = -x / (L1 * L2 * sin_theta2)
+    dt2_dy = -y / (L1 * L2 * sin_theta2)
+
+    # theta1 = phi - psi, psi depends on theta2 only
+    dpsi_dt2 = L2 * (L2 + L1 * cos_theta2) / r2
+    dt1_dx = -y / r2 - dpsi_dt2 * dt2_dx
+    dt1_dy = x / r2 - dpsi_dt2 * dt2_dy
+
+    # m1 follows theta1, m2 follows theta1 + theta2 (a2 = a1 + deg(theta2) + const)
+    k = GEAR_REDUCTION / (2 * math.pi)
+    return k * dt1_dx, k * dt1_dy, k * (dt1_dx + dt2_dx), k * (dt1_dy + dt2_dy)
+
+
+def solve_leg_velocity(xs, ys, vxs, vys):
+    """
+    Motor velocities (v1, v2) in revolutions/s for a foot at xs, ys
+    moving at vxs, vys mm/s.
+    """
+    j11, j12, j21, j22 = leg_jacobian(xs, ys)
+    return j11 * vxs + j12 * vys, j21 * vxs + j22 * vys
+
+
 async def calculate_motor_positions(x1, y1):
     global _filteredY_old, _filteredX_old
 
@@ -39,49 +143,28 @@ async def calculate_motor_positions(x1, y1):
     _filteredx_old = x_filtered
 
     # ----------------------------------------------------------------
-    # Example geometry: the rest of your calculations
-    #   (as from your snippet). We replace “y1” with “y_filtered.”
+    # Geometry: solve_leg_ik() on the interpolated point
     # ----------------------------------------------------------------
-    # Offsets
-    x = (x_interpolated - 27.972)
-    # Use filtered Y in geometry, not raw y1
-    y = (y_interpolated - 232.631)
-
-    gear_reduction = 6
-    L1, L2 = 150, 180  # link lengths in mm
-
-    # Law of cosines for theta2
-    cos_theta2 = (x**2 + y**2 - L1**2 - L2**2) / (2 * L1 * L2)
-    cos_theta2 = max(min(cos_theta2, 1), -1)  # clamp for safety
-    theta2 = math.acos(cos_theta2)
-
-    # theta1
-    phi = math.atan2(y, x)
-    psi = math.atan2(L2 * math.sin(theta2), L1 + L2 * math.cos(theta2))
-    theta1 = phi - psi
-
-    # Convert angles to motor-friendly positions
-    a1 = math.degrees(theta1) + 147.052
-    a3 = 180 - math.degrees(theta2)
-    a2 = 90 + a1 - a3  # simplified expression
-
-    # Adjust for gear ratio
-    m1 = (a1 / 360.0) * gear_reduction
-    m2 = (a2 / 360.0) * gear_reduction
+    if ik_grid is not None:
+        m1, m2 = ik_grid.solve(x_interpolated, y_interpolated)
+    else:
+        m1, m2 = solve_leg_ik(x_interpolated, y_interpolated)
+
+    # Joint velocities of the ramps' current foot velocity, so the
+    # controllers follow the motion instead of chasing each new target
+    if velocity_feedforward:
+        vx, vy = interpolation_velocity()
+        v1, v2 = solve_leg_velocity(x_interpolated, y_interpolated, vx, vy)
+    else:
+        v1 = v2 = None
 
     # ----------------------------------------------------------------
     # Step 3: Send to motors
     # ----------------------------------------------------------------
-    result1 = await c1.set_position(
-        position=m1,
-        accel_limit=20,
-        velocity_limit=math.nan,
-        kp_scale=1,
-        kd_scale=1,
-        watchdog_timeout=math.nan
-    )
-    result2 = await c2.set_position(
-        position=m2,
+    # Both commands go out in one transport cycle
+    result1, result2 = await set_positions(
+        get_pool().controllers(*LEG_IDS), [m1, m2],
+        velocity=[v1, v2],
         accel_limit=20,
         velocity_limit=math.nan,
         kp_scale=1,
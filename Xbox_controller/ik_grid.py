@@ -0,0 +1,177 @@
+import json
+import os
+
+import numpy as np
+
+from Xbox_controller.ik_equations import solve_leg_ik, X_OFFSET, Y_OFFSET, L1, L2, THETA1_OFFSET, GEAR_REDUCTION
+
+
+# ----------------------------------------------------------------
+# Precomputed IK grid for streaming one foot position at a time.
+# solve_leg_ik() is sampled once over a regular (x, y) grid; a lookup
+# is then a bilinear blend of stored per-cell coefficients, read with
+# plain float arithmetic instead of a trip through NumPy.
+#
+# Every cell carries an error estimate: the largest difference between
+# the bilinear value and the exact solver, sampled on a 3x3 pattern
+# inside the cell and at the edge midpoints (in motor revolutions).
+# Cells over tolerance, and cells touching the edge of the reachable
+# workspace, are stored as NaN; solve() sends those points (and points
+# off the grid) to the exact solver.
+#
+# Only the single-point path is faster. For arrays of points the
+# vectorized solve_leg_ik() is already as fast as a table gather, so
+# batch users (compile_trajectory, the gait generator) keep it.
+#
+# The grid is saved as a .npy file plus meta.json and memory-mapped
+# on load, so later start-ups skip the build.
+#
+#   grid = IKGrid.load_or_build()
+#   m1, m2 = grid.solve(x, y)
+# ----------------------------------------------------------------
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ik_grid")
+
+# Stored with the grid; a grid built for another geometry is rebuilt
+_GEOMETRY = {
+    "x_offset": X_OFFSET,
+    "y_offset": Y_OFFSET,
+    "l1": L1,
+    "l2": L2,
+    "theta1_offset": THETA1_OFFSET,
+    "gear_reduction": GEAR_REDUCTION,
+}
+
+
+def reach_margin(xs, ys):
+    """
+    Distance (mm) from each foot position to the nearest edge of the
+    reachable annulus; negative when out of reach.
+    """
+    r = np.hypot(np.asarray(xs, dtype=float) - X_OFFSET, np.asarray(ys, dtype=float) - Y_OFFSET)
+    return np.minimum(r - abs(L1 - L2), (L1 + L2) - r)
+
+
+class IKGrid:
+    def __init__(self, coeffs, x0, y0, step, max_error, tolerance):
+        """
+        coeffs: (ny, nx, 8) bilinear coefficients per cell, NaN where the
+        exact solver is used; may be a memory-mapped array.
+        """
+        self.coeffs = coeffs
+        self.x0 = x0
+        self.y0 = y0
+        self.step = step
+        self.max_error = max_error
+        self.tolerance = tolerance
+        self.ny, self.nx = coeffs.shape[:2]
+        # Flat float view onto the same buffer (no copy, also when
+        # memory-mapped); slicing it is much cheaper than array indexing
+        self._table = memoryview(coeffs).cast("B").cast("d")
+
+    @classmethod
+    def build(cls, x_range=(-150.0, 150.0), y_range=(-150.0, 100.0), step=1.0,
+              edge_margin=2.0, tolerance=1e-3):
+        xs = np.arange(x_range[0], x_range[1] + step / 2, step)
+        ys = np.arange(y_range[0], y_range[1] + step / 2, step)
+        gx, gy = np.meshgrid(xs, ys)
+        joints = np.stack(solve_leg_ik(gx, gy))
+
+        # Error estimate per cell against the exact solver
+        cell_error = np.zeros((len(ys) - 1, len(xs) - 1))
+        cx, cy = gx[:-1, :-1], gy[:-1, :-1]
+        for tx, ty in [(0.25, 0.25), (0.5, 0.25), (0.75, 0.25),
+                       (0.25, 0.5), (0.5, 0.5), (0.75, 0.5),
+                       (0.25, 0.75), (0.5, 0.75), (0.75, 0.75),
+                       (0.5, 0.0), (0.0, 0.5)]:
+            exact = np.stack(solve_leg_ik(cx + tx * step, cy + ty * step))
+            approx = _blend(joints, tx, ty)
+            cell_error = np.maximum(cell_error, np.max(np.abs(exact - approx), axis=0))
+
+        # Cells with any corner near or past the workspace edge are not used
+        near_edge = reach_margin(gx, gy) < edge_margin
+        bad = near_edge[:-1, :-1] | near_edge[1:, :-1] | near_edge[:-1, 1:] | near_edge[1:, 1:]
+        bad |= cell_error > tolerance
+
+        # m(tx, ty) = a + (b - a) tx + ((c - a) + (d - b - c + a) tx) ty,
+        # stored interleaved as m1, m2 pairs
+        a = joints[:, :-1, :-1]
+        b = joints[:, :-1, 1:]
+        c = joints[:, 1:, :-1]
+        d = joints[:, 1:, 1:]
+        coeffs = np.stack([a, b - a, c - a, d - b - c + a]).transpose(2, 3, 0, 1)
+        coeffs = np.ascontiguousarray(coeffs.reshape(bad.shape + (8,)))
+        coeffs[bad] = np.nan
+
+        usable = cell_error[~bad]
+        max_error = float(usable.max()) if usable.size else 0.0
+        return cls(coeffs, float(xs[0]), float(ys[0]), float(step), max_error, tolerance)
+
+    # ----------------------------------------------------------------
+    # Disk cache
+    # ----------------------------------------------------------------
+    def save(self, path=DEFAULT_PATH):
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "coeffs.npy"), np.asarray(self.coeffs))
+        meta = {"x0": self.x0, "y0": self.y0, "step": self.step,
+                "max_error": self.max_error, "tolerance": self.tolerance,
+                "geometry": _GEOMETRY}
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+
+    @classmethod
+    def load(cls, path=DEFAULT_PATH):
+        """
+        Memory-maps a saved grid. Returns None if there is none, or if it
+        was built for a different leg geometry.
+        """
+        try:
+            with open(os.path.join(path, "meta.json")) as f:
+                meta = json.load(f)
+            if meta["geometry"] != _GEOMETRY:
+                return None
+            coeffs = np.load(os.path.join(path, "coeffs.npy"), mmap_mode="r")
+            return cls(coeffs, meta["x0"], meta["y0"], meta["step"],
+                       meta["max_error"], meta["tolerance"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    @classmethod
+    def load_or_build(cls, path=DEFAULT_PATH, tolerance=1e-3, **kwargs):
+        grid = cls.load(path)
+        if grid is None or grid.tolerance != tolerance:
+            grid = cls.build(tolerance=tolerance, **kwargs)
+            grid.save(path)
+            grid = cls.load(path)
+        return grid
+
+    # ----------------------------------------------------------------
+    # Queries
+    # ----------------------------------------------------------------
+    def solve(self, x, y):
+        """
+        Motor positions (m1, m2) for one foot position, as floats. Within
+        max_error of solve_leg_ik() on the grid, exact everywhere else.
+        """
+        fx = (x - self.x0) / self.step
+        fy = (y - self.y0) / self.step
+        if 0 <= fx < self.nx and 0 <= fy < self.ny:
+            i = int(fx)
+            j = int(fy)
+            k = (j * self.nx + i) * 8
+            c0, c1, c2, c3, c4, c5, c6, c7 = self._table[k:k + 8]
+            if c0 == c0:  # NaN: cell left to the exact solver
+                tx = fx - i
+                ty = fy - j
+                return c0 + c2 * tx + (c4 + c6 * tx) * ty, c1 + c3 * tx + (c5 + c7 * tx) * ty
+        m1, m2 = solve_leg_ik(x, y)
+        return float(m1), float(m2)
+
+
+def _blend(joints, tx, ty):
+    # Bilinear blend at (tx, ty) inside every cell of the table
+    a = joints[:, :-1, :-1]
+    b = joints[:, :-1, 1:]
+    c = joints[:, 1:, :-1]
+    d = joints[:, 1:, 1:]
+    return (a * (1 - tx) + b * tx) * (1 - ty) + (c * (1 - tx) + d * tx) * ty
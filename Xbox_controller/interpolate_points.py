@@ -1,4 +1,6 @@
-from Xbox_controller.ramp import Ramp, LINEAR, ONCEFORWARD
+import numpy as np
+
+from Xbox_controller.ramp import Ramp, RampBank, LINEAR, ONCEFORWARD
 
 myRampY = Ramp(0)
 interpolationFlagY = 0
@@ -9,6 +11,14 @@ interpolationFlagX = 0
 savedValueX = 0
 
 
+def set_clock(clock) -> None:
+    """
+    Run the X/Y ramps from another clock (e.g. ramp.ManualClock).
+    """
+    myRampY.setClock(clock)
+    myRampX.setClock(clock)
+
+
 def interpolation_y(input_val: int, duration: int) -> int:
     global interpolationFlagY, savedValueY, myRampY
 
@@ -46,3 +56,29 @@ def interpolation_x(input_val: int, duration: int) -> int:
     # Update and return the current ramp value
     output = myRampX.update()
     return int(output)  # cast to int if desired
+
+
+def interpolation_velocity():
+    """
+    Current (x, y) velocity of the X/Y ramps, in units per second.
+    """
+    return myRampX.getVelocity(), myRampY.getVelocity()
+
+
+def interpolation_bank(bank: RampBank, input_vals, duration: int) -> np.ndarray:
+    """
+    Same as interpolation_x/interpolation_y, but for every channel of a
+    RampBank at once: channels whose input changed are retargeted, then
+    the whole bank is updated.
+    """
+    input_vals = np.asarray(input_vals, dtype=float)
+
+    # Check for new data
+    changed = input_vals != bank.getTarget()
+
+    # Restart the ramp on every channel that got a new value
+    if changed.any():
+        bank.go(input_vals[changed], duration, LINEAR, ONCEFORWARD, channels=changed)
+
+    # Update and return the current ramp values
+    return bank.update()
@@ -0,0 +1,111 @@
+import threading
+import time
+from collections import deque, namedtuple
+
+import pygame
+
+
+# ----------------------------------------------------------------
+# Background joystick reader. pygame and the joystick are initialized
+# once, on a separate thread that polls at a fixed rate. The latest
+# axes/buttons are published as one immutable snapshot (a plain
+# reference swap, so readers never take a lock), and button presses
+# and releases are queued as edge events so none are missed between
+# control ticks.
+# ----------------------------------------------------------------
+
+JoystickState = namedtuple("JoystickState", ["axes", "buttons", "timestamp", "seq"])
+ButtonEvent = namedtuple("ButtonEvent", ["button", "down", "timestamp"])
+
+
+class JoystickReader:
+    def __init__(self, index=0, poll_rate=250, max_events=256):
+        self.index = index
+        self.period = 1.0 / poll_rate
+        self._state = None
+        self._events = deque(maxlen=max_events)
+        self._running = False
+        self._ready = threading.Event()
+        self._error = None
+        self._thread = None
+
+    def start(self, timeout=2.0):
+        """
+        Start polling and wait for the first snapshot.
+        """
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="joystick", daemon=True)
+        self._thread.start()
+        if not self._ready.wait(timeout):
+            self.stop()
+            raise TimeoutError("Joystick reader did not start")
+        if self._error is not None:
+            raise self._error
+        return self
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        try:
+            pygame.init()
+            joystick = pygame.joystick.Joystick(self.index)
+            joystick.init()
+        except Exception as e:
+            self._error = e
+            self._ready.set()
+            return
+
+        n_axes = joystick.get_numaxes()
+        n_buttons = joystick.get_numbuttons()
+        previous = (0,) * n_buttons
+        seq = 0
+        deadline = time.monotonic()
+
+        try:
+            while self._running:
+                pygame.event.pump()
+                now = time.monotonic()
+                axes = tuple(joystick.get_axis(i) for i in range(n_axes))
+                buttons = tuple(joystick.get_button(i) for i in range(n_buttons))
+
+                for i in range(n_buttons):
+                    if buttons[i] != previous[i]:
+                        self._events.append(ButtonEvent(i, bool(buttons[i]), now))
+                previous = buttons
+
+                seq += 1
+                self._state = JoystickState(axes, buttons, now, seq)
+                self._ready.set()
+
+                deadline += self.period
+                time.sleep(max(deadline - time.monotonic(), 0))
+        finally:
+            pygame.quit()
+
+    # ----------------------------------------------------------------
+    # Readers (safe to call from the control loop)
+    # ----------------------------------------------------------------
+    def snapshot(self):
+        """
+        Latest JoystickState.
+        """
+        return self._state
+
+    def get_events(self):
+        """
+        Drain and return the ButtonEvents queued since the last call.
+        """
+        events = []
+        while self._events:
+            events.append(self._events.popleft())
+        return events
+
+    def get_pressed(self):
+        """
+        Set of buttons pressed down since the last call.
+        """
+        return {e.button for e in self.get_events() if e.down}
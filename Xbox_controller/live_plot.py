@@ -0,0 +1,200 @@
+import multiprocessing
+import sys
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+# ----------------------------------------------------------------
+# Live plot in a separate process. The control loop writes each
+# sample (time, then target and position per joint) as one row of a
+# ring buffer in shared memory; all it pays per tick is that copy. A
+# viewer process started with start() reads the ring, decimates the
+# visible window to min/max per pixel column and redraws with
+# matplotlib at its own rate, so plotting never touches loop timing.
+#
+#   live = LivePlot(joints=2).start()
+#   live.record(t, (m1, m2), (p1, p2))   # in the control loop
+#   live.close()
+# ----------------------------------------------------------------
+
+_HEADER = 2  # int64 slots before the data: samples written, closed flag
+
+
+class SharedRing:
+    def __init__(self, joints=1, capacity=100000, name=None):
+        """
+        Creates the ring, or attaches to an existing one when name is
+        given.
+        """
+        self.joints = joints
+        self.capacity = capacity
+        self.width = 1 + 2 * joints  # time, targets, positions
+        size = _HEADER * 8 + capacity * self.width * 8
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = self.shm.name
+        self.header = np.ndarray((_HEADER,), dtype=np.int64, buffer=self.shm.buf)
+        self.data = np.ndarray((capacity, self.width), dtype=np.float64, buffer=self.shm.buf, offset=_HEADER * 8)
+        self._row = np.zeros(self.width)
+
+    def write(self, t, targets, positions):
+        row = self._row
+        row[0] = t
+        row[1:1 + self.joints] = targets
+        row[1 + self.joints:] = positions
+        count = int(self.header[0])
+        self.data[count % self.capacity] = row
+        # Publish the row only after it is complete
+        self.header[0] = count + 1
+
+    def read(self):
+        """
+        Copy of the stored rows in time order: (samples, 1 + 2 * joints).
+        """
+        count = int(self.header[0])
+        if count <= self.capacity:
+            rows = self.data[:count].copy()
+        else:
+            i = count % self.capacity
+            rows = np.concatenate([self.data[i:], self.data[:i]])
+        # The writer may have gone on during the copy. Sample s is
+        # overwritten by sample s + capacity, so every sample up to the
+        # one being written now, minus capacity, may be torn: drop those
+        # (the oldest rows of the copy)
+        first = max(count - self.capacity, 0)
+        torn = int(self.header[0]) - self.capacity - first + 1
+        return rows[max(torn, 0):]
+
+    def closed(self):
+        return bool(self.header[1])
+
+    def close(self, unlink=False):
+        # Drop the numpy views first, they hold the buffer
+        self.header = self.data = None
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+def decimate_minmax(t, y, columns):
+    """
+    Reduces (t, y) to the min and max of y within each of `columns`
+    equal time bins, so a plot keeps every peak at any zoom level.
+    t must be increasing.
+    """
+    if len(t) <= 2 * columns:
+        return t, y
+    edges = np.searchsorted(t, np.linspace(t[0], t[-1], columns + 1)[:-1])
+    edges = np.unique(edges)
+    lo = np.minimum.reduceat(y, edges)
+    hi = np.maximum.reduceat(y, edges)
+    x = np.repeat(t[edges], 2)
+    out = np.empty(2 * len(edges))
+    out[0::2] = lo
+    out[1::2] = hi
+    return x, out
+
+
+class LivePlot:
+    def __init__(self, joints=1, capacity=100000, window=10.0, rate=20):
+        """
+        window is the span of time shown (s), rate the redraw rate of the
+        viewer (Hz).
+        """
+        self.ring = SharedRing(joints, capacity)
+        self.window = window
+        self.rate = rate
+        self.process = None
+
+    def start(self, timeout=5.0):
+        context = multiprocessing.get_context("spawn")
+        ready = context.Event()
+        self.process = context.Process(
+            target=_viewer,
+            args=(self.ring.name, self.ring.joints, self.ring.capacity, self.window, self.rate, ready),
+            name="live-plot", daemon=True)
+        self.process.start()
+        # The viewer must attach before close() can unlink the memory
+        if not ready.wait(timeout):
+            self.process.terminate()
+            raise TimeoutError("Live plot viewer did not start")
+        return self
+
+    def record(self, t, targets, positions):
+        self.ring.write(t, targets, positions)
+
+    def record_results(self, t, targets, results):
+        """
+        Same as record() with positions from moteus query results (nan
+        where there was no reply).
+        """
+        if not isinstance(results, (list, tuple)):
+            results = (results,)
+        self.ring.write(t, targets, [r.values.get(1, np.nan) if r is not None else np.nan for r in results])
+
+    def close(self):
+        """
+        Stops feeding the viewer; its window stays open until closed.
+        """
+        self.ring.header[1] = 1
+        self.ring.close(unlink=True)
+
+
+def _viewer(name, joints, capacity, window, rate, ready):
+    ring = SharedRing(joints, capacity, name)
+    ready.set()
+
+    import matplotlib.pyplot as plt
+
+    fig, axes = plt.subplots(joints, 1, squeeze=False, sharex=True)
+    lines = []
+    for j in range(joints):
+        ax = axes[j][0]
+        target, = ax.plot([], [], linestyle="--", label=f"Motor {j + 1} Target")
+        position, = ax.plot([], [], alpha=0.7, label=f"Motor {j + 1} Feedback")
+        ax.set_ylabel("Position (rev)")
+        ax.grid(True)
+        ax.legend(loc="upper left")
+        lines.append((target, position))
+    axes[-1][0].set_xlabel("Time (s)")
+    plt.show(block=False)
+
+    finished = False
+    while plt.fignum_exists(fig.number):
+        if not finished:
+            finished = ring.closed()
+            rows = ring.read()
+            if len(rows):
+                t = rows[:, 0]
+                start = np.searchsorted(t, t[-1] - window)
+                t = t[start:]
+                columns = max(int(axes[0][0].bbox.width), 1)
+                for j, (target, position) in enumerate(lines):
+                    target.set_data(*decimate_minmax(t, rows[start:, 1 + j], columns))
+                    position.set_data(*decimate_minmax(t, rows[start:, 1 + joints + j], columns))
+                    axes[j][0].relim()
+                    axes[j][0].autoscale_view()
+        plt.pause(1.0 / rate)
+
+    ring.close()
+
+
+if __name__ == "__main__":
+    # Demo: a 1 Hz sine with a lagging "feedback"
+    import math
+    import time
+
+    live = LivePlot(joints=2).start()
+    start = time.monotonic()
+    try:
+        while True:
+            t = time.monotonic() - start
+            targets = (math.sin(2 * math.pi * t), math.cos(2 * math.pi * t))
+            live.record(t, targets, (math.sin(2 * math.pi * (t - 0.05)), math.cos(2 * math.pi * (t - 0.05))))
+            time.sleep(0.005)
+    except KeyboardInterrupt:
+        live.close()
+        sys.exit(0)
@@ -0,0 +1,384 @@
+import asyncio
+import json
+import math
+import os
+
+import numpy as np
+
+from Xbox_controller.query_profiles import profile, POSITION
+from Xbox_controller.telemetry import TelemetryRecorder
+
+
+# ----------------------------------------------------------------
+# PD autotuner. Instead of trying every kp_scale/kd_scale pair on a
+# grid, a search strategy picks the next trials from the results so
+# far, so a few tens of trials reach the SSE of the 225-trial grid.
+#
+# A trial is any coroutine function trial(kp, kd) -> SSE: the hardware
+# step test in PID_Tuning.py, or sim_trial() on the simulated plant,
+# which pool_trial(run_sim_trial, ...) spreads over a process pool.
+#
+# Strategies (all work on kp/kd scaled to 0..1 within the bounds):
+#   COORDINATE   compass search: try +-step on each axis, halve the
+#                step when nothing improves
+#   NELDER_MEAD  downhill simplex
+#   BAYESIAN     Gaussian process on log(SSE) with expected improvement
+#
+# Results are kept per plant in pd_tuning.json; passing them back as
+# history warm-starts the next session (known points are not re-run
+# and the search starts from the best one).
+#
+#   tuner = PDTuner(trial, history=load_history("leg1"))
+#   kp, kd, sse = await tuner.tune(NELDER_MEAD)
+#   save_history("leg1", tuner.history)
+# ----------------------------------------------------------------
+
+# Search strategies
+COORDINATE = 0x00
+NELDER_MEAD = 0x01
+BAYESIAN = 0x02
+
+tuning_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pd_tuning.json")
+
+# Step test: positions commanded one step_time apart
+test_positions = [0.0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0]
+test_step_time = 0.02
+
+
+class _BudgetExhausted(Exception):
+    pass
+
+
+# ----------------------------------------------------------------
+# Trials
+# ----------------------------------------------------------------
+async def step_test(controller, kp_scale, kd_scale, positions=None, step_time=None, sleep=asyncio.sleep,
+                    telemetry=None):
+    """
+    Steps through positions, recording target and feedback into
+    telemetry (a one-joint TelemetryRecorder, cleared first). Returns
+    the recorder.
+    """
+    positions = test_positions if positions is None else positions
+    step_time = test_step_time if step_time is None else step_time
+    velocity = (positions[1] - positions[0]) / step_time
+
+    if telemetry is None:
+        telemetry = TelemetryRecorder(1, capacity=len(positions))
+    telemetry.clear()
+    elapsed_time = 0.0
+
+    # Move to the initial position and wait for completion
+    await controller.set_position_wait_complete(position=positions[0], velocity_limit=20, accel_limit=20)
+
+    for position in positions:
+        # Set the motor position and query feedback
+        result = await controller.set_position(position=position,
+                                               velocity=velocity,
+                                               kd_scale=kd_scale,
+                                               kp_scale=kp_scale,
+                                               watchdog_timeout=math.nan,
+                                               query_override=profile(POSITION))
+        telemetry.record_results(elapsed_time, position, result)
+
+        await sleep(step_time)
+        elapsed_time += step_time
+
+    # Stop the motor after finishing
+    await controller.set_stop()
+    return telemetry
+
+
+async def sim_trial(kp, kd, motor=None):
+    """
+    Step test on a fresh simulated joint; returns the SSE. motor holds
+    SimMotor parameters.
+    """
+    from Xbox_controller.sim_controller import SimController, SimMotor, SimTransport
+
+    # dt=0: time only moves in sleep(), as it would between bus cycles
+    transport = SimTransport(dt=0.0)
+    controller = SimController(1, transport, SimMotor(**(motor or {})))
+
+    async def advance(seconds):
+        transport.advance(seconds)
+
+    telemetry = await step_test(controller, kp, kd, sleep=advance)
+    return float(telemetry.sse()[0])
+
+
+def run_sim_trial(kp, kd, motor=None):
+    """
+    sim_trial() as a plain function, for worker processes.
+    """
+    return asyncio.run(sim_trial(kp, kd, motor))
+
+
+def pool_trial(fn, executor, *args):
+    """
+    Wraps a picklable fn(kp, kd, *args) -> SSE as a trial that runs in
+    executor (e.g. a ProcessPoolExecutor). Use with PDTuner(concurrency=N).
+    """
+    async def trial(kp, kd):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, fn, kp, kd, *args)
+    return trial
+
+
+# ----------------------------------------------------------------
+# Warm start
+# ----------------------------------------------------------------
+def load_history(plant, path=None):
+    """
+    [(kp, kd, sse), ...] stored for plant, empty if none.
+    """
+    try:
+        with open(path or tuning_path) as f:
+            return [tuple(h) for h in json.load(f).get(plant, [])]
+    except (OSError, ValueError):
+        return []
+
+
+def save_history(plant, history, path=None):
+    try:
+        with open(path or tuning_path) as f:
+            stored = json.load(f)
+    except (OSError, ValueError):
+        stored = {}
+    stored[plant] = [list(h) for h in history]
+    with open(path or tuning_path, "w") as f:
+        json.dump(stored, f, indent=2, sort_keys=True)
+
+
+# ----------------------------------------------------------------
+# Tuner
+# ----------------------------------------------------------------
+class PDTuner:
+    def __init__(self, trial, bounds=((0.01, 2.0), (0.01, 2.0)), budget=20, history=(),
+                 concurrency=1, seed=None):
+        self.trial = trial
+        self.low = np.array([b[0] for b in bounds], dtype=float)
+        self.high = np.array([b[1] for b in bounds], dtype=float)
+        self.budget = budget            # new trials allowed per tune()
+        self.concurrency = concurrency  # trials run at once (1 for hardware)
+        self.rng = np.random.default_rng(seed)
+        self.history = [tuple(h) for h in history]  # (kp, kd, sse)
+        self.trials = 0
+
+    def _scale(self, kp, kd):
+        return (np.array([kp, kd]) - self.low) / (self.high - self.low)
+
+    def _unscale(self, u):
+        return self.low + np.clip(u, 0.0, 1.0) * (self.high - self.low)
+
+    def _known(self):
+        # Normalized points and SSEs of everything tried so far
+        if not self.history:
+            return np.empty((0, 2)), np.empty(0)
+        h = np.array(self.history, dtype=float)
+        return (h[:, :2] - self.low) / (self.high - self.low), h[:, 2]
+
+    def best(self):
+        """
+        (kp, kd, sse) with the lowest SSE so far, None before any trial.
+        """
+        return min(self.history, key=lambda h: h[2]) if self.history else None
+
+    async def evaluate(self, points):
+        """
+        SSE for each normalized point. Points already in the history are
+        not re-run; raises _BudgetExhausted once the budget is used up.
+        """
+        points = [np.clip(np.asarray(u, dtype=float), 0.0, 1.0) for u in points]
+        gains = [tuple(float(round(g, 4)) for g in self._unscale(u)) for u in points]
+        cached = {(h[0], h[1]): h[2] for h in self.history}
+
+        todo = list(dict.fromkeys(g for g in gains if g not in cached))
+        if len(todo) > self.budget - self.trials:
+            todo = todo[:self.budget - self.trials]
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run(kp, kd):
+            async with semaphore:
+                value = float(await self.trial(kp, kd))
+            print(f"Trial kp={kp:.4f}, kd={kd:.4f}: SSE={value:.6f}")
+            return value
+
+        values = await asyncio.gather(*[run(kp, kd) for kp, kd in todo])
+        for (kp, kd), value in zip(todo, values):
+            self.history.append((kp, kd, value))
+            cached[(kp, kd)] = value
+        self.trials += len(todo)
+
+        if any(g not in cached for g in gains):
+            raise _BudgetExhausted()
+        return [cached[g] for g in gains]
+
+    async def tune(self, strategy=NELDER_MEAD, x0=None, **options):
+        """
+        Runs strategy (a constant above, or a coroutine function
+        strategy(tuner, u0, **options) working on normalized points)
+        from x0 = (kp, kd), or from the best known point. Returns the
+        best (kp, kd, sse), from this run or the history.
+        """
+        if self.budget < 1 and not self.history:
+            raise ValueError("budget allows no trials and there is no history to return")
+        if x0 is None:
+            best = self.best()
+            x0 = (best[0], best[1]) if best else ((self.low + self.high) / 2)
+        search = STRATEGIES.get(strategy, strategy)
+
+        self.trials = 0
+        try:
+            await search(self, self._scale(*x0), **options)
+        except _BudgetExhausted:
+            pass
+        kp, kd, value = self.best()
+        print(f"Optimal PD values: kp={kp}, kd={kd}, SSE={value:.6f} ({self.trials} trials)")
+        return kp, kd, value
+
+
+# ----------------------------------------------------------------
+# Strategies
+# ----------------------------------------------------------------
+async def coordinate_descent(tuner, u0, step=0.25, min_step=0.01):
+    u = np.asarray(u0, dtype=float)
+    (f,) = await tuner.evaluate([u])
+    while step >= min_step:
+        # All four moves in one batch, so they can run in parallel
+        moves = [u + d for d in (np.array([step, 0]), np.array([-step, 0]),
+                                 np.array([0, step]), np.array([0, -step]))]
+        values = await tuner.evaluate(moves)
+        i = int(np.argmin(values))
+        if values[i] < f:
+            u, f = np.clip(moves[i], 0.0, 1.0), values[i]
+        else:
+            step /= 2
+
+
+async def nelder_mead(tuner, u0, size=0.2, tolerance=1e-3):
+    u0 = np.asarray(u0, dtype=float)
+    # Initial simplex pointing into the box
+    simplex = [u0]
+    for i in range(2):
+        v = u0.copy()
+        v[i] += size if u0[i] + size <= 1.0 else -size
+        simplex.append(v)
+    simplex = [np.clip(v, 0.0, 1.0) for v in simplex]
+    values = await tuner.evaluate(simplex)
+
+    while True:
+        order = np.argsort(values)
+        simplex = [simplex[i] for i in order]
+        values = [values[i] for i in order]
+        if max(np.max(np.abs(v - simplex[0])) for v in simplex[1:]) < tolerance:
+            return
+
+        centroid = (simplex[0] + simplex[1]) / 2
+        worst = simplex[2]
+        reflected = np.clip(centroid + (centroid - worst), 0.0, 1.0)
+        (fr,) = await tuner.evaluate([reflected])
+
+        if fr < values[0]:
+            expanded = np.clip(centroid + 2 * (centroid - worst), 0.0, 1.0)
+            (fe,) = await tuner.evaluate([expanded])
+            simplex[2], values[2] = (expanded, fe) if fe < fr else (reflected, fr)
+        elif fr < values[1]:
+            simplex[2], values[2] = reflected, fr
+        else:
+            contracted = centroid + 0.5 * ((reflected if fr < values[2] else worst) - centroid)
+            (fc,) = await tuner.evaluate([contracted])
+            if fc < min(fr, values[2]):
+                simplex[2], values[2] = contracted, fc
+            else:
+                # Shrink towards the best point
+                simplex[1:] = [simplex[0] + 0.5 * (v - simplex[0]) for v in simplex[1:]]
+                values[1:] = await tuner.evaluate(simplex[1:])
+
+
+def _normal_cdf(z):
+    return 0.5 * (1.0 + np.vectorize(math.erf)(z / math.sqrt(2.0)))
+
+
+def _gp_posterior(u, y, candidates, noise=1e-4):
+    """
+    Mean and standard deviation of a zero-mean GP (squared exponential
+    kernel, length scale picked by marginal likelihood) at candidates.
+    """
+    best = None
+    d2 = np.sum((u[:, None, :] - u[None, :, :]) ** 2, axis=-1)
+    for length in (0.05, 0.1, 0.2, 0.4):
+        K = np.exp(-d2 / (2 * length ** 2)) + noise * np.eye(len(u))
+        L = np.linalg.cholesky(K)
+        alpha = np.linalg.solve(L.T, np.linalg.solve(L, y))
+        log_likelihood = -0.5 * y @ alpha - np.sum(np.log(np.diag(L)))
+        if best is None or log_likelihood > best[0]:
+            best = (log_likelihood, length, L, alpha)
+    _, length, L, alpha = best
+
+    ks = np.exp(-np.sum((candidates[:, None, :] - u[None, :, :]) ** 2, axis=-1) / (2 * length ** 2))
+    mean = ks @ alpha
+    v = np.linalg.solve(L, ks.T)
+    std = np.sqrt(np.maximum(1.0 - np.sum(v ** 2, axis=0), 1e-12))
+    return mean, std
+
+
+async def bayesian(tuner, u0, initial=5, batch=None, candidates=2000):
+    batch = batch or tuner.concurrency
+    u, f = tuner._known()
+
+    # Initial design: the start point plus random points, unless the
+    # history already covers it
+    design = [np.asarray(u0, dtype=float)]
+    design += list(tuner.rng.random((max(initial - len(f) - 1, 0), 2)))
+    await tuner.evaluate(design)
+
+    while True:
+        u, f = tuner._known()
+        # Model log(SSE), standardized. Trials with missing replies (SSE
+        # inf) count as the worst finite one
+        y = np.log(np.maximum(f, 1e-12))
+        finite = np.isfinite(y)
+        y = np.where(finite, y, y[finite].max() if finite.any() else 0.0)
+        mean_y, std_y = y.mean(), y.std() or 1.0
+        y = (y - mean_y) / std_y
+
+        pool = tuner.rng.random((candidates, 2))
+        proposals = []
+        for _ in range(batch):
+            mean, std = _gp_posterior(u, y, pool)
+            z = (y.min() - mean) / std
+            ei = (y.min() - mean) * _normal_cdf(z) + std * np.exp(-0.5 * z ** 2) / math.sqrt(2 * math.pi)
+            pick = pool[int(np.argmax(ei))]
+            proposals.append(pick)
+            # Constant liar: pretend the pick scored the current best so
+            # the rest of the batch looks elsewhere
+            u = np.vstack([u, pick])
+            y = np.append(y, y.min())
+        await tuner.evaluate(proposals)
+
+
+STRATEGIES = {
+    COORDINATE: coordinate_descent,
+    NELDER_MEAD: nelder_mead,
+    BAYESIAN: bayesian,
+}
+
+
+# ----------------------------------------------------------------
+# Simulated tuning session
+# ----------------------------------------------------------------
+async def _main(strategy=NELDER_MEAD):
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = os.cpu_count() or 1
+    with ProcessPoolExecutor(workers) as executor:
+        tuner = PDTuner(pool_trial(run_sim_trial, executor), history=load_history("sim"),
+                        concurrency=workers)
+        await tuner.tune(strategy)
+    save_history("sim", tuner.history)
+
+
+if __name__ == '__main__':
+    asyncio.run(_main())
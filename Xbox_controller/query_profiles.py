@@ -0,0 +1,79 @@
+import moteus
+
+
+# ----------------------------------------------------------------
+# Query resolution profiles. A query with moteus' default resolution
+# returns mode, position, velocity, torque, voltage, temperature and
+# fault in every reply, although most call sites only read position
+# (and torque when homing). Each call site instead picks the smallest
+# profile that covers what it reads and passes it as query_override,
+# which shrinks the reply frame and the bus time per cycle:
+#
+#   POSITION         position (teleop, interpolation, PD tuning)
+#   POSITION_TORQUE  position, torque (single-speed homing)
+#   KINEMATICS       position, velocity, torque (two-speed homing,
+#                    which also watches velocity for stalls)
+#   HOME_STATE       home state only (whether the output position was
+#                    set since power-up; cached homing)
+#   FULL             everything useful for diagnostics
+#
+# Every profile keeps mode and fault (one byte each), so faults are
+# still seen.
+#
+#   result = await c1.set_position(position=0.5, query_override=profile(POSITION))
+# ----------------------------------------------------------------
+
+# Profiles
+POSITION = 0x00
+POSITION_TORQUE = 0x01
+KINEMATICS = 0x02
+FULL = 0x03
+HOME_STATE = 0x04
+
+PROFILES = {}
+
+
+def register_profile(key, **resolutions):
+    """
+    Adds (or replaces) a profile: a QueryResolution that ignores every
+    register except mode, fault and the ones given, e.g.
+    register_profile(KEY, position=moteus.F32, velocity=moteus.INT16).
+    """
+    qr = moteus.QueryResolution()
+    for name, value in vars(moteus.QueryResolution).items():
+        if not name.startswith("_") and isinstance(value, int):
+            setattr(qr, name, moteus.IGNORE)
+    qr.mode = moteus.INT8
+    qr.fault = moteus.INT8
+    for name, resolution in resolutions.items():
+        if not hasattr(moteus.QueryResolution, name):
+            raise ValueError(f"Unknown register: {name}")
+        setattr(qr, name, resolution)
+    PROFILES[key] = qr
+    return qr
+
+
+def profile(key):
+    """
+    QueryResolution of a registered profile, for query_override=.
+    """
+    return PROFILES[key]
+
+
+def reply_size(key):
+    """
+    Expected reply payload size in bytes for a profile.
+    """
+    _, size = moteus.Controller(1)._make_query_data(PROFILES[key])
+    return size
+
+
+register_profile(POSITION, position=moteus.F32)
+register_profile(POSITION_TORQUE, position=moteus.F32, torque=moteus.F32)
+register_profile(KINEMATICS, position=moteus.F32, velocity=moteus.F32, torque=moteus.F32)
+register_profile(HOME_STATE, home_state=moteus.INT8)
+register_profile(FULL,
+                 position=moteus.F32, velocity=moteus.F32, torque=moteus.F32,
+                 q_current=moteus.F32, d_current=moteus.F32, abs_position=moteus.F32,
+                 power=moteus.F32, motor_temperature=moteus.F32, trajectory_complete=moteus.INT8,
+                 home_state=moteus.INT8, voltage=moteus.F32, temperature=moteus.F32)
@@ -1,13 +1,46 @@
 import time
 import math
+import functools
+
+import numpy as np
+
+
+# ----------------------------------------------------------------
+# Clocks. Ramps read time through a clock object so it can be
+# swapped out: MonotonicClock is the real one (nanosecond counter,
+# not affected by wall-clock changes), ManualClock only moves when
+# advanced, for tests, replays and faster-than-real-time runs.
+# Both return milliseconds as a float.
+# ----------------------------------------------------------------
+class MonotonicClock:
+    def millis(self):
+        return time.monotonic_ns() / 1e6
+
+
+class ManualClock:
+    def __init__(self, start=0.0):
+        self.now = float(start)
+
+    def millis(self):
+        return self.now
+
+    def advance(self, ms):
+        self.now += ms
+        return self.now
+
+    def set(self, ms):
+        self.now = float(ms)
+
+
+default_clock = MonotonicClock()
 
 
 # ----------------------------------------------------------------
 # Helper function to replicate Arduino's millis() in Python
-# (returns milliseconds as an integer).
+# (milliseconds from the default clock).
 # ----------------------------------------------------------------
 def millis():
-    return int(time.time() * 1000)
+    return default_clock.millis()
 
 
 # ----------------------------------------------------------------
@@ -197,13 +230,222 @@ def ramp_calc(k: float, m: int) -> float:
     return k
 
 
+# ----------------------------------------------------------------
+# Vectorized versions of the functions above. These take a NumPy
+# array of k values (0..1) and evaluate a whole curve in one pass,
+# so a trajectory can be sampled without one Python call per point.
+# Results match ramp_calc() element for element (to within rounding
+# of the last bit, since NumPy and math use different pow routines).
+# ----------------------------------------------------------------
+
+def _edges(k, out):
+    # Same edge conditions as ramp_calc(): 0 and 1 are returned as-is
+    return np.where((k == 0.0) | (k == 1.0), k, out)
+
+
+def powinout_array(k, p: int):
+    k2 = k * 2.0
+    return np.where(k2 < 1, 0.5 * (k2 ** p), 1.0 - 0.5 * np.abs((2 - k2) ** p))
+
+
+def _bounce_out_array(k):
+    k2 = np.where(k < (1.0 / 2.75), k,
+         np.where(k < (2.0 / 2.75), k - (1.5 / 2.75),
+         np.where(k < (2.5 / 2.75), k - (2.25 / 2.75), k - (2.625 / 2.75))))
+    c = np.where(k < (1.0 / 2.75), 0.0,
+        np.where(k < (2.0 / 2.75), 0.75,
+        np.where(k < (2.5 / 2.75), 0.9375, 0.984375)))
+    return _edges(k, 7.5625 * k2 * k2 + c)
+
+
+def _bounce_in_array(k):
+    return _edges(k, 1.0 - _bounce_out_array(1.0 - k))
+
+
+def ramp_calc_array(k, m: int) -> np.ndarray:
+    """
+    Array version of ramp_calc(): evaluates mode m for every element of k.
+    """
+    k = np.asarray(k, dtype=float)
+
+    # Piecewise modes evaluate both branches over the whole array, so the
+    # unused branch may see out-of-range values (e.g. sqrt of a negative)
+    with np.errstate(invalid='ignore', over='ignore'):
+        if m == QUADRATIC_IN:
+            out = powin(k, 2)
+        elif m == QUADRATIC_OUT:
+            out = powout(k, 2)
+        elif m == QUADRATIC_INOUT:
+            out = powinout_array(k, 2)
+        elif m == CUBIC_IN:
+            out = powin(k, 3)
+        elif m == CUBIC_OUT:
+            out = powout(k, 3)
+        elif m == CUBIC_INOUT:
+            out = powinout_array(k, 3)
+        elif m == QUARTIC_IN:
+            out = powin(k, 4)
+        elif m == QUARTIC_OUT:
+            out = powout(k, 4)
+        elif m == QUARTIC_INOUT:
+            out = powinout_array(k, 4)
+        elif m == QUINTIC_IN:
+            out = powin(k, 5)
+        elif m == QUINTIC_OUT:
+            out = powout(k, 5)
+        elif m == QUINTIC_INOUT:
+            out = powinout_array(k, 5)
+        elif m == SINUSOIDAL_IN:
+            out = 1.0 - np.cos(k * (math.pi / 2.0))
+        elif m == SINUSOIDAL_OUT:
+            out = np.sin(k * (math.pi / 2.0))
+        elif m == SINUSOIDAL_INOUT:
+            out = -0.5 * (np.cos(math.pi * k) - 1.0)
+        elif m == EXPONENTIAL_IN:
+            out = 2.0 ** (10.0 * (k - 1.0))
+        elif m == EXPONENTIAL_OUT:
+            out = 1.0 - (2.0 ** (-10.0 * k))
+        elif m == EXPONENTIAL_INOUT:
+            k2 = k * 2.0
+            out = np.where(k2 < 1.0,
+                           0.5 * (2.0 ** (10.0 * (k2 - 1.0))),
+                           0.5 * (2.0 - (2.0 ** (-10.0 * (k2 - 1.0)))))
+        elif m == CIRCULAR_IN:
+            out = -(np.sqrt(1.0 - k * k) - 1.0)
+        elif m == CIRCULAR_OUT:
+            k2 = k - 1.0
+            out = np.sqrt(1.0 - k2 * k2)
+        elif m == CIRCULAR_INOUT:
+            k2 = k * 2.0
+            k3 = k2 - 2.0
+            out = np.where(k2 < 1.0,
+                           -0.5 * (np.sqrt(1.0 - k2 * k2) - 1.0),
+                           0.5 * (np.sqrt(1.0 - k3 * k3) + 1.0))
+        elif m == ELASTIC_IN:
+            a = 1.0
+            p = 0.3 * 1.5
+            s = p * math.asin(1.0 / a) / (2.0 * math.pi)
+            k2 = k - 1.0
+            out = -(a * (2.0 ** (10.0 * k2)) * np.sin((k2 - s) * (2.0 * math.pi) / p))
+        elif m == ELASTIC_OUT:
+            a = 1.0
+            p = 0.3
+            s = p * math.asin(1.0 / a) / (2.0 * math.pi)
+            out = a * (2.0 ** (-10.0 * k)) * np.sin((k - s) * (2.0 * math.pi) / p) + 1.0
+        elif m == ELASTIC_INOUT:
+            a = 1.0
+            p = 0.3 * 1.5
+            s = p * math.asin(1.0 / a) / (2.0 * math.pi)
+            k2 = 2.0 * k - 1.0
+            out = np.where(k2 < 0.0,
+                           -0.5 * (a * (2.0 ** (10.0 * k2)) * np.sin((k2 - s) * (2.0 * math.pi) / p)),
+                           0.5 * a * (2.0 ** (-10.0 * k2)) * np.sin((k2 - s) * (2.0 * math.pi) / p) + 1.0)
+        elif m == BACK_IN:
+            s = 1.70158
+            out = k * k * ((s + 1.0) * k - s)
+        elif m == BACK_OUT:
+            s = 1.70158
+            k2 = k - 1.0
+            out = k2 * k2 * ((s + 1.0) * k2 + s) + 1.0
+        elif m == BACK_INOUT:
+            s = 1.70158
+            s *= 1.525
+            k2 = k * 2.0
+            k3 = k2 - 2.0
+            out = np.where(k2 < 1.0,
+                           0.5 * (k2 * k2 * ((s + 1.0) * k2 - s)),
+                           0.5 * (k3 * k3 * ((s + 1.0) * k3 + s) + 2.0))
+        elif m == BOUNCE_IN:
+            out = _bounce_in_array(k)
+        elif m == BOUNCE_OUT:
+            out = _bounce_out_array(k)
+        elif m == BOUNCE_INOUT:
+            out = np.where(k < 0.5,
+                           _bounce_in_array(k * 2.0) * 0.5,
+                           _bounce_out_array(k * 2.0 - 1.0) * 0.5 + 0.5)
+        else:
+            # Default: LINEAR
+            out = k
+
+    return _edges(k, out)
+
+
+# ----------------------------------------------------------------
+# Lookup tables. ramp_table() samples a mode once at a fixed
+# resolution and caches it; lut_sample() then reads a value back
+# with linear interpolation, which costs about as much as LINEAR
+# whatever the mode is. Ramp.setLUT() only uses a table for the modes
+# in LUT_MODES, where it made Ramp.update faster (bench.py):
+#
+#   mode        Ramp.update with LUT    max error (1024 entries)
+#   ELASTIC_*   about 25% faster        < 5e-4
+#   BOUNCE_*    about 40% faster        < 2e-3
+#   BACK_*      about 10% faster        < 4e-6
+#
+# The other modes stay on the exact formula. The polynomial,
+# SINUSOIDAL and EXPONENTIAL modes were as fast or faster without a
+# table, and CIRCULAR tables are off by up to 1.1e-2 near the vertical
+# tangent at the ends. ramp_lut_error() gives the error of any mode
+# and resolution; smooth modes improve with resolution squared,
+# BOUNCE (kinks) more slowly.
+# ----------------------------------------------------------------
+LUT_RESOLUTION = 1024
+LUT_MODES = frozenset([
+    ELASTIC_IN, ELASTIC_OUT, ELASTIC_INOUT,
+    BACK_IN, BACK_OUT, BACK_INOUT,
+    BOUNCE_IN, BOUNCE_OUT, BOUNCE_INOUT,
+])
+LUT_CACHE_SIZE = 64  # enough for every mode at two resolutions
+
+
+@functools.lru_cache(maxsize=LUT_CACHE_SIZE)
+def ramp_table(m: int, resolution: int = LUT_RESOLUTION) -> tuple:
+    """
+    Returns resolution + 1 samples of mode m over k = 0..1.
+    """
+    k = np.linspace(0.0, 1.0, resolution + 1)
+    return tuple(ramp_calc_array(k, m).tolist())
+
+
+def lut_sample(table: tuple, k: float) -> float:
+    """
+    Linearly interpolates a table from ramp_table() at k (0..1).
+    """
+    n = len(table) - 1
+    x = k * n
+    i = int(x)
+    if i >= n:
+        return table[n]
+    lo = table[i]
+    return lo + (table[i + 1] - lo) * (x - i)
+
+
+def ramp_calc_lut(k: float, m: int, resolution: int = LUT_RESOLUTION) -> float:
+    """
+    Table-based stand-in for ramp_calc(k, m).
+    """
+    return lut_sample(ramp_table(m, resolution), k)
+
+
+def ramp_lut_error(m: int, resolution: int = LUT_RESOLUTION, oversample: int = 16) -> float:
+    """
+    Maximum absolute error of the mode m table against ramp_calc_array(),
+    checked on a grid `oversample` times finer than the table.
+    """
+    k = np.linspace(0.0, 1.0, resolution + 1)
+    fine = np.linspace(0.0, 1.0, resolution * oversample + 1)
+    approx = np.interp(fine, k, np.asarray(ramp_table(m, resolution)))
+    return float(np.max(np.abs(approx - ramp_calc_array(fine, m))))
+
+
 # ----------------------------------------------------------------
 # Python class that replicates the template <class T> _ramp in C++.
 # In Python, we'll just store values as floats (or the same type
 # passed by the user, but Python is dynamically typed anyway).
 # ----------------------------------------------------------------
 class Ramp:
-    def __init__(self, initial_value=0):
+    def __init__(self, initial_value=0, clock=None):
+        self.clock = clock if clock is not None else default_clock
         self.init(initial_value)
 
     def init(self, _val):
@@ -211,7 +453,7 @@ class Ramp:
         self.B = float(_val)  # target
         self.val = float(_val)  # current ramped value
         self.mode = NONE
-        self.t = millis()
+        self.t = self.clock.millis()
         self.dur = 0
         self.pos = 0
         self.grain = 10
@@ -219,6 +461,8 @@ class Ramp:
         self.speed = FORWARD
         self.paused = False
         self.automated = True
+        self.lut = 0  # table resolution, 0 = exact ramp_calc()
+        self.table = None
 
     def update(self):
         doUpdate = True
@@ -227,7 +471,7 @@ class Ramp:
 
         # If in automated mode, only update if enough time (>= grain) has passed
         if self.automated:
-            newTime = millis()
+            newTime = self.clock.millis()
             delta = newTime - self.t
             doUpdate = (delta >= self.grain)
 
@@ -263,11 +507,15 @@ class Ramp:
                 # Recompute value
                 if (self.mode != NONE) and (self.dur > 0) and (self.A != self.B):
                     k = float(self.pos) / float(self.dur)
+                    if self.table is not None:
+                        r = lut_sample(self.table, k)
+                    else:
+                        r = ramp_calc(k, self.mode)
                     # If B >= A, we ramp up; otherwise we ramp down
                     if self.B >= self.A:
-                        self.val = self.A + (self.B - self.A) * ramp_calc(k, self.mode)
+                        self.val = self.A + (self.B - self.A) * r
                     else:
-                        self.val = self.A - (self.A - self.B) * ramp_calc(k, self.mode)
+                        self.val = self.A - (self.A - self.B) * r
                 else:
                     # If no duration or same values, just set final
                     self.val = self.B
@@ -285,7 +533,7 @@ class Ramp:
         self.B = float(_val)
         self.mode = _mode
         self.dur = _dur
-        self.t = millis()
+        self.t = self.clock.millis()
 
         if _dur == 0:
             self.val = self.B
@@ -299,6 +547,7 @@ class Ramp:
 
         self.loop = _loop
         self.paused = False
+        self._load_table()
         return self.val
 
     # ----------------------------------------------------------------
@@ -346,6 +595,25 @@ class Ramp:
     def setAutomation(self, _automated):
         self.automated = _automated
 
+    def setClock(self, _clock):
+        self.clock = _clock
+        self.t = self.clock.millis()
+
+    def setLUT(self, _resolution=LUT_RESOLUTION):
+        """
+        Sample the easing curve from a cached lookup table instead of
+        calling ramp_calc() on every update, for modes in LUT_MODES
+        (others stay exact). 0 switches back to exact.
+        """
+        self.lut = _resolution
+        self._load_table()
+
+    def _load_table(self):
+        if self.lut and self.mode in LUT_MODES:
+            self.table = ramp_table(self.mode, self.lut)
+        else:
+            self.table = None
+
     # ----------------------------------------------------------------
     # Getters
     # ----------------------------------------------------------------
@@ -364,6 +632,163 @@ class Ramp:
     def getValue(self):
         return self.val
 
+    def getVelocity(self):
+        """
+        Rate of change of the value in units per second at the current
+        position (0 when not running).
+        """
+        if self.mode == NONE or self.dur <= 0 or self.paused or self.isFinished():
+            return 0.0
+        # Slope of the easing curve by central difference over k
+        h = 1e-4
+        k = float(self.pos) / float(self.dur)
+        k0, k1 = max(k - h, 0.0), min(k + h, 1.0)
+        slope = (ramp_calc(k1, self.mode) - ramp_calc(k0, self.mode)) / (k1 - k0)
+        direction = 1.0 if self.speed == FORWARD else -1.0
+        return direction * (self.B - self.A) * slope * 1000.0 / self.dur
+
+    def getOrigin(self):
+        return self.A
+
+    def getTarget(self):
+        return self.B
+
+
+# ----------------------------------------------------------------
+# RampBank: N ramps stored as NumPy arrays (one element per channel)
+# so all of them are advanced by a single update() call. Each channel
+# behaves like its own Ramp object, including grain and loop modes.
+# ----------------------------------------------------------------
+class RampBank:
+    def __init__(self, channels, initial_value=0, clock=None):
+        self.n = channels
+        self.clock = clock if clock is not None else default_clock
+        self.init(initial_value)
+
+    def init(self, _val):
+        n = self.n
+        self.A = np.full(n, _val, dtype=float)  # origin
+        self.B = self.A.copy()  # target
+        self.val = self.A.copy()  # current ramped value
+        self.mode = np.full(n, NONE, dtype=np.int8)
+        self.t = np.full(n, self.clock.millis())
+        self.dur = np.zeros(n)
+        self.pos = np.zeros(n)
+        self.loop = np.full(n, ONCEFORWARD, dtype=np.int8)
+        self.speed = np.full(n, FORWARD, dtype=np.int8)
+        self.paused = np.zeros(n, dtype=bool)
+        self.grain = 10
+        self.automated = True
+        self._groups = {}
+
+    def update(self):
+        if self.automated:
+            newTime = self.clock.millis()
+            delta = newTime - self.t
+            doUpdate = (self.mode != NONE) & (delta >= self.grain)
+            if not doUpdate.any():
+                return self.val
+            self.t[doUpdate] = newTime
+        else:
+            delta = np.full(self.n, float(self.grain))
+            doUpdate = self.mode != NONE
+
+        # If finished, handle loop logic
+        forward = self.speed == FORWARD
+        finished = doUpdate & np.where(forward, self.pos == self.dur, self.pos == 0)
+        self.pos[finished & (self.loop == LOOPFORWARD)] = 0
+        rewind = finished & (self.loop == LOOPBACKWARD)
+        self.pos[rewind] = self.dur[rewind]
+        flip = finished & ((self.loop == FORTHANDBACK) | (self.loop == BACKANDFORTH))
+        self.speed[flip] = np.where(forward[flip], BACKWARD, FORWARD)
+
+        # Update position
+        move = doUpdate & ~self.paused
+        forward = self.speed == FORWARD
+        self.pos = np.where(move & forward, np.minimum(self.pos + delta, self.dur), self.pos)
+        self.pos = np.where(move & ~forward, np.maximum(self.pos - delta, 0), self.pos)
+
+        # Recompute value; same-valued or zero-length ramps jump to target
+        self.val[move] = self.B[move]
+        ramping = move & (self.dur > 0) & (self.A != self.B)
+        for m, idx in self._groups.items():
+            idx = idx[ramping[idx]]
+            if idx.size:
+                k = self.pos[idx] / self.dur[idx]
+                self.val[idx] = self.A[idx] + (self.B[idx] - self.A[idx]) * ramp_calc_array(k, m)
+
+        return self.val
+
+    def go(self, _val, _dur=0, _mode=NONE, _loop=ONCEFORWARD, channels=None):
+        """
+        Retarget the given channels (index array, mask or slice; all by
+        default). _val, _dur, _mode and _loop may be scalars or arrays.
+        """
+        ch = np.arange(self.n)[slice(None) if channels is None else channels]
+        dur = np.broadcast_to(np.asarray(_dur, dtype=float), ch.shape)
+        loop = np.broadcast_to(np.asarray(_loop), ch.shape)
+
+        self.A[ch] = self.val[ch]
+        self.B[ch] = _val
+        self.mode[ch] = _mode
+        self.dur[ch] = dur
+        self.t[ch] = self.clock.millis()
+
+        instant = ch[dur == 0]
+        self.val[instant] = self.B[instant]
+
+        backward = loop >= ONCEBACKWARD
+        self.pos[ch] = np.where(backward, dur, 0)
+        self.speed[ch] = np.where(backward, BACKWARD, FORWARD)
+
+        self.loop[ch] = loop
+        self.paused[ch] = False
+        self._groups = {int(m): np.flatnonzero(self.mode == m)
+                        for m in np.unique(self.mode) if m != NONE}
+        return self.val
+
+    # ----------------------------------------------------------------
+    # Pause / Resume
+    # ----------------------------------------------------------------
+    def pause(self, channels=None):
+        self.paused[slice(None) if channels is None else channels] = True
+
+    def resume(self, channels=None):
+        self.paused[slice(None) if channels is None else channels] = False
+
+    # ----------------------------------------------------------------
+    # State checks (one bool per channel)
+    # ----------------------------------------------------------------
+    def isFinished(self):
+        return np.where(self.speed == FORWARD, self.pos == self.dur, self.pos == 0)
+
+    def isRunning(self):
+        return ~self.isFinished() & ~self.paused
+
+    # ----------------------------------------------------------------
+    # Setters
+    # ----------------------------------------------------------------
+    def setGrain(self, _grain):
+        self.grain = _grain
+
+    def setAutomation(self, _automated):
+        self.automated = _automated
+
+    def setClock(self, _clock):
+        self.clock = _clock
+        self.t[:] = self.clock.millis()
+
+    # ----------------------------------------------------------------
+    # Getters
+    # ----------------------------------------------------------------
+    def getCompletion(self):
+        done = np.where(self.isFinished(), 100.0, 0.0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.dur == 0, done, (self.pos * 10000.0 / self.dur) / 100.0)
+
+    def getValue(self):
+        return self.val
+
     def getOrigin(self):
         return self.A
 
@@ -0,0 +1,84 @@
+import asyncio
+import time
+
+
+# ----------------------------------------------------------------
+# Fixed-rate control loop. Ticks are scheduled against absolute
+# deadlines (start + n * period), so compute and bus time inside a
+# tick do not add to the period and the rate does not drift.
+# ----------------------------------------------------------------
+
+# What to do when a tick runs past the next deadline
+CATCHUP = 0x00  # run the missed ticks back to back until on schedule again
+SKIP = 0x01     # drop the missed ticks and wait for the next future deadline
+
+
+class FixedRateLoop:
+    def __init__(self, rate_hz=100, policy=SKIP, clock=time.monotonic):
+        self.period = 1.0 / rate_hz
+        self.policy = policy
+        self.clock = clock
+        self.running = False
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.ticks = 0
+        self.overruns = 0     # ticks that finished after the next deadline
+        self.skipped = 0      # deadlines dropped by the SKIP policy
+        self.max_jitter = 0.0  # worst lateness of a tick start vs its deadline (s)
+        self.worst_tick = 0.0  # longest time spent in the tick body (s)
+        self.total_tick = 0.0
+
+    async def run(self, body, *args):
+        """
+        Await body(*args) once per period until stop() is called or the
+        body returns False.
+        """
+        self.running = True
+        deadline = self.clock()
+
+        while self.running:
+            start = self.clock()
+            self.max_jitter = max(self.max_jitter, start - deadline)
+
+            result = await body(*args)
+
+            end = self.clock()
+            elapsed = end - start
+            self.ticks += 1
+            self.total_tick += elapsed
+            self.worst_tick = max(self.worst_tick, elapsed)
+
+            if result is False:
+                break
+
+            deadline += self.period
+            if end > deadline:
+                self.overruns += 1
+                if self.policy == SKIP:
+                    missed = int((end - deadline) / self.period) + 1
+                    self.skipped += missed
+                    deadline += missed * self.period
+
+            # Always yield to the event loop, even when catching up
+            await asyncio.sleep(max(deadline - self.clock(), 0))
+
+        self.running = False
+
+    def stop(self):
+        self.running = False
+
+    # ----------------------------------------------------------------
+    # Getters
+    # ----------------------------------------------------------------
+    def getRate(self):
+        return 1.0 / self.period
+
+    def getMeanTick(self):
+        return self.total_tick / self.ticks if self.ticks else 0.0
+
+    def report(self):
+        return (f"ticks: {self.ticks}, overruns: {self.overruns}, skipped: {self.skipped}, "
+                f"max jitter: {self.max_jitter * 1000:.3f} ms, "
+                f"worst tick: {self.worst_tick * 1000:.3f} ms, "
+                f"mean tick: {self.getMeanTick() * 1000:.3f} ms")
@@ -0,0 +1,338 @@
+import asyncio
+import math
+import time
+
+
+# ----------------------------------------------------------------
+# Simulated moteus controller. SimController accepts the calls our
+# scripts make on moteus.Controller (set_position, set_stop,
+# set_position_wait_complete, set_output_exact, plus make_position /
+# make_stop for dispatch.py) and drives a simple motor model instead
+# of the CAN bus:
+#
+#   - position/velocity integrated with a PD law whose gains are
+#     scaled by kp_scale/kd_scale, plus feedforward torque
+#   - torque saturated at min(maximum_torque, the motor's max torque)
+#   - hard stops at the joint limits (where the torque builds up, which
+#     is what the homing routines look for)
+#   - accel_limit/velocity_limit shape the setpoint like the moteus
+#     trajectory generator, and report trajectory completion
+#   - a velocity sent with a position moves the target (and, once
+#     reached, the setpoint) on at that velocity, as moteus does
+#
+# Replies carry result.values with the moteus register numbers
+# (1 position, 2 velocity, 3 torque...). Positions are in revolutions
+# at the motor output, as with moteus. With query_override only the
+# registers that resolution asks for are returned.
+#
+# With SimTransport(dt=...) every cycle advances simulated time by a
+# fixed step, so loops run as fast as the CPU allows; with dt=None the
+# simulation follows the real clock.
+#
+#   transport = SimTransport(dt=0.005)
+#   c1 = SimController(1, transport=transport)
+# ----------------------------------------------------------------
+
+# moteus register numbers
+MODE = 0x000
+POSITION = 0x001
+VELOCITY = 0x002
+TORQUE = 0x003
+TRAJECTORY_COMPLETE = 0x00b
+HOME_STATE = 0x00c
+VOLTAGE = 0x00d
+TEMPERATURE = 0x00e
+FAULT = 0x00f
+
+# moteus modes
+MODE_STOPPED = 0
+MODE_FAULT = 1
+MODE_POSITION = 10
+
+SUBSTEP = 0.0005  # integration step (s)
+
+_IGNORE = 4  # moteus.IGNORE
+
+# QueryResolution attribute of each register
+_RESOLUTION_NAMES = {
+    MODE: "mode",
+    POSITION: "position",
+    VELOCITY: "velocity",
+    TORQUE: "torque",
+    TRAJECTORY_COMPLETE: "trajectory_complete",
+    HOME_STATE: "home_state",
+    VOLTAGE: "voltage",
+    TEMPERATURE: "temperature",
+    FAULT: "fault",
+}
+
+
+def _given(value):
+    return value is not None and not math.isnan(value)
+
+
+class SimMotor:
+    def __init__(self, kp=4.0, kd=0.1, inertia=0.001, friction=0.01, max_torque=1.0,
+                 neg_limit=-1.2, pos_limit=1.2, position=0.0):
+        self.kp = kp                # Nm/rev
+        self.kd = kd                # Nm/(rev/s)
+        self.inertia = inertia      # kg m^2 at the output
+        self.friction = friction    # viscous, Nm/(rev/s)
+        self.max_torque = max_torque
+        self.neg_limit = neg_limit  # hard stops (raw position)
+        self.pos_limit = pos_limit
+
+        self.position = position    # raw position, rev
+        self.velocity = 0.0
+        self.torque = 0.0
+        self.offset = 0.0           # reported = raw + offset (set_output_exact)
+        self.home_state = 0         # 0 relative to power-up, 2 output set
+
+        self.mode = MODE_STOPPED
+        self._reset_command()
+
+    def _reset_command(self):
+        self.target = None          # commanded position (raw), None = hold/velocity only
+        self.command_velocity = 0.0
+        self.feedforward = 0.0
+        self.kp_scale = 1.0
+        self.kd_scale = 1.0
+        self.maximum_torque = self.max_torque
+        self.velocity_limit = math.nan
+        self.accel_limit = math.nan
+        self.setpoint = self.position
+        self.setpoint_velocity = 0.0
+        self.trajectory_complete = True
+
+    # ----------------------------------------------------------------
+    # Commands
+    # ----------------------------------------------------------------
+    def stop(self):
+        self.mode = MODE_STOPPED
+        self._reset_command()
+
+    def set_position(self, position=None, velocity=None, feedforward_torque=None,
+                     kp_scale=None, kd_scale=None, maximum_torque=None,
+                     velocity_limit=None, accel_limit=None, **kwargs):
+        # nan position keeps the current setpoint (or the measured
+        # position when coming out of another mode)
+        if self.mode != MODE_POSITION:
+            self.setpoint = self.position
+            self.setpoint_velocity = 0.0
+        self.mode = MODE_POSITION
+
+        self.target = position - self.offset if _given(position) else None
+        self.command_velocity = velocity if _given(velocity) else 0.0
+        self.feedforward = feedforward_torque if _given(feedforward_torque) else 0.0
+        self.kp_scale = kp_scale if _given(kp_scale) else 1.0
+        self.kd_scale = kd_scale if _given(kd_scale) else 1.0
+        self.maximum_torque = min(maximum_torque, self.max_torque) if _given(maximum_torque) else self.max_torque
+        self.velocity_limit = velocity_limit if velocity_limit is not None else math.nan
+        self.accel_limit = accel_limit if accel_limit is not None else math.nan
+
+        limited = _given(self.velocity_limit) or _given(self.accel_limit)
+        if self.target is not None and not limited:
+            self.setpoint = self.target
+            self.setpoint_velocity = self.command_velocity
+        # Re-sending the current target does not restart the trajectory
+        self.trajectory_complete = self.target is None or not limited or self.setpoint == self.target
+
+    def set_output_exact(self, position=0.0):
+        self.offset = position - self.position
+        self.home_state = 2
+
+    # ----------------------------------------------------------------
+    # Dynamics
+    # ----------------------------------------------------------------
+    def step(self, dt):
+        while dt > 1e-12:
+            h = min(dt, SUBSTEP)
+            self._substep(h)
+            dt -= h
+
+    def _advance_setpoint(self, h):
+        if self.target is None:
+            # Velocity mode: the setpoint runs at the commanded velocity
+            self.setpoint_velocity = self.command_velocity
+            self.setpoint += self.command_velocity * h
+            return
+        if self.trajectory_complete:
+            # On target: carry on at the commanded velocity
+            self.setpoint += self.command_velocity * h
+            return
+
+        # Plan relative to the target, which itself moves at the
+        # commanded velocity
+        error = self.target - self.setpoint
+        relative = self.setpoint_velocity - self.command_velocity
+        vmax = self.velocity_limit if _given(self.velocity_limit) else math.inf
+        amax = self.accel_limit if _given(self.accel_limit) else math.inf
+        desired = math.copysign(min(vmax, math.sqrt(2 * amax * abs(error)) if error else 0.0), error)
+        relative += max(-amax * h, min(amax * h, desired - relative))
+        self.setpoint_velocity = self.command_velocity + relative
+        step = relative * h
+        self.target += self.command_velocity * h
+
+        # Arrive once this step would reach (or pass) the target
+        if abs(error) <= abs(step) or abs(error) < 1e-9:
+            self.setpoint = self.target
+            self.setpoint_velocity = self.command_velocity
+            self.trajectory_complete = True
+        else:
+            self.setpoint += step + self.command_velocity * h
+
+    def _substep(self, h):
+        if self.mode == MODE_POSITION:
+            self._advance_setpoint(h)
+            torque = (self.kp * self.kp_scale * (self.setpoint - self.position) +
+                      self.kd * self.kd_scale * (self.setpoint_velocity - self.velocity) +
+                      self.feedforward)
+            torque = max(-self.maximum_torque, min(self.maximum_torque, torque))
+        else:
+            torque = 0.0
+        self.torque = torque
+
+        accel = (torque - self.friction * self.velocity) / (self.inertia * 2 * math.pi)
+        self.velocity += accel * h
+        self.position += self.velocity * h
+
+        # Hard stops
+        if self.position > self.pos_limit:
+            self.position = self.pos_limit
+            self.velocity = min(self.velocity, 0.0)
+        elif self.position < self.neg_limit:
+            self.position = self.neg_limit
+            self.velocity = max(self.velocity, 0.0)
+
+    def values(self):
+        return {
+            MODE: self.mode,
+            POSITION: self.position + self.offset,
+            VELOCITY: self.velocity,
+            TORQUE: self.torque,
+            TRAJECTORY_COMPLETE: self.trajectory_complete,
+            HOME_STATE: self.home_state,
+            VOLTAGE: 24.0,
+            TEMPERATURE: 30.0,
+            FAULT: 0,
+        }
+
+
+class SimCommand:
+    def __init__(self, id, kind, kwargs, query, query_override=None):
+        self.id = id
+        self.kind = kind
+        self.kwargs = kwargs
+        self.query = query or query_override is not None
+        self.query_override = query_override
+
+    def reply(self, values):
+        qr = self.query_override
+        if qr is not None:
+            values = {r: v for r, v in values.items() if getattr(qr, _RESOLUTION_NAMES[r], _IGNORE) != _IGNORE}
+        return SimResult(self.id, values)
+
+
+class SimResult:
+    def __init__(self, id, values):
+        self.id = id
+        self.values = values
+
+    def __repr__(self):
+        return f"{self.id}/{self.values}"
+
+
+class SimTransport:
+    def __init__(self, dt=None, clock=time.monotonic):
+        self.dt = dt
+        self.clock = clock
+        self.motors = {}
+        self.time = 0.0  # simulated seconds
+        self._last = None
+
+    def motor(self, id):
+        if id not in self.motors:
+            self.motors[id] = SimMotor()
+        return self.motors[id]
+
+    def advance(self, seconds):
+        for m in self.motors.values():
+            m.step(seconds)
+        self.time += seconds
+
+    def _elapsed(self):
+        now = self.clock()
+        elapsed = 0.0 if self._last is None else now - self._last
+        self._last = now
+        return elapsed
+
+    async def cycle(self, commands):
+        # Commands take effect, then the plant runs for one period and
+        # queried controllers report their state
+        if self.dt is None:
+            self.advance(self._elapsed())
+        for c in commands:
+            m = self.motor(c.id)
+            if c.kind == "position":
+                m.set_position(**c.kwargs)
+            elif c.kind == "stop":
+                m.stop()
+            elif c.kind == "output_exact":
+                m.set_output_exact(**c.kwargs)
+        if self.dt is not None:
+            self.advance(self.dt)
+        await asyncio.sleep(0)
+        return [c.reply(self.motors[c.id].values()) for c in commands if c.query]
+
+
+class SimController:
+    def __init__(self, id=1, transport=None, motor=None):
+        self.id = id
+        self.transport = transport if transport is not None else SimTransport()
+        if motor is not None:
+            self.transport.motors[id] = motor
+        self.transport.motor(id)
+
+    def _get_transport(self):
+        return self.transport
+
+    async def _execute(self, command):
+        results = await self.transport.cycle([command])
+        return results[0] if results else None
+
+    # ----------------------------------------------------------------
+    # make_* (for dispatch.py)
+    # ----------------------------------------------------------------
+    def make_position(self, query=False, query_override=None, **kwargs):
+        return SimCommand(self.id, "position", kwargs, query, query_override)
+
+    def make_stop(self, query=False, query_override=None):
+        return SimCommand(self.id, "stop", {}, query, query_override)
+
+    def make_set_output_exact(self, position=0.0, query=False):
+        return SimCommand(self.id, "output_exact", {"position": position}, query)
+
+    # ----------------------------------------------------------------
+    # set_* (same calls as moteus.Controller)
+    # ----------------------------------------------------------------
+    async def set_position(self, **kwargs):
+        return await self._execute(self.make_position(**kwargs))
+
+    async def set_stop(self, query=False, query_override=None):
+        return await self._execute(self.make_stop(query, query_override))
+
+    async def set_output_exact(self, position=0.0, query=False):
+        return await self._execute(self.make_set_output_exact(position, query))
+
+    async def set_position_wait_complete(self, period_s=0.025, query_override=None, **kwargs):
+        kwargs.pop("query", None)
+        count = 2
+        while True:
+            result = await self.set_position(query=True, **kwargs)
+            count = max(count - 1, 0)
+            if count == 0 and result.values[TRAJECTORY_COMPLETE]:
+                return result
+            if self.transport.dt is not None:
+                self.transport.advance(period_s)
+            else:
+                await asyncio.sleep(period_s)
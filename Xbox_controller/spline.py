@@ -0,0 +1,249 @@
+import bisect
+import math
+
+import numpy as np
+
+
+# ----------------------------------------------------------------
+# Foot paths as piecewise polynomials in time over (x, y) foot space.
+# Every segment stores its polynomial coefficients, computed once when
+# the path is built:
+#
+#   cubic_spline()    C2 cubic spline through waypoints
+#   quintic_spline()  quintic Hermite segments through waypoints with
+#                     given (or estimated) velocity and acceleration
+#   bezier()          one Bezier curve from control points
+#   swing_curve()     Bezier swing: lift off, rise to a height, touch
+#                     down, with zero velocity at both ends
+#   line()            constant-velocity segment (e.g. stance)
+#
+# Paths can be joined with concatenate(). sample(t) finds the segment
+# (direct index for evenly spaced breaks, a bisect otherwise) and
+# returns position, velocity and acceleration from one small matrix
+# product, so a path needs only a handful of waypoints and its
+# derivatives are exact (usable as feedforward).
+#
+#   path = concatenate(line((40, -50), (-40, -50), 0.5),
+#                      swing_curve((-40, -50), (40, -50), 30, 0.25))
+#   p, v, a = path.sample(0.6)
+# ----------------------------------------------------------------
+
+class FootPath:
+    def __init__(self, breaks, coeffs):
+        """
+        breaks: (n + 1,) segment start/end times; coeffs: (n, degree + 1, 2)
+        power-basis coefficients of each segment in local time
+        tau = t - breaks[i], lowest order first.
+        """
+        self.breaks = np.asarray(breaks, dtype=float)
+        self.coeffs = np.asarray(coeffs, dtype=float)
+        n, order, _ = self.coeffs.shape
+        self.degree = order - 1
+
+        # Per segment, one (6, order) matrix: rows x, y, vx, vy, ax, ay
+        k = np.arange(order, dtype=float)
+        d1 = np.zeros_like(self.coeffs)
+        d1[:, :-1] = self.coeffs[:, 1:] * k[1:, None]
+        d2 = np.zeros_like(self.coeffs)
+        d2[:, :-1] = d1[:, 1:] * k[1:, None]
+        self._matrix = np.concatenate([self.coeffs, d1, d2], axis=2).transpose(0, 2, 1).copy()
+
+        self._break_list = self.breaks.tolist()
+        steps = np.diff(self.breaks)
+        self._uniform = bool(np.allclose(steps, steps[0])) if n else True
+        self._step = float(steps[0]) if n else 1.0
+        self._exponents = np.arange(order)
+
+    def __len__(self):
+        return len(self.coeffs)
+
+    def duration(self):
+        return float(self.breaks[-1] - self.breaks[0])
+
+    def segment(self, t):
+        """
+        Index of the segment holding time t (clamped to the path).
+        """
+        if self._uniform:
+            i = int((t - self._break_list[0]) / self._step)
+        else:
+            i = bisect.bisect_right(self._break_list, t) - 1
+        return min(max(i, 0), len(self.coeffs) - 1)
+
+    def sample(self, t):
+        """
+        Position, velocity and acceleration at time t, each an (x, y)
+        array. Outside the path the end segments are held at their ends.
+        """
+        t = min(max(t, self._break_list[0]), self._break_list[-1])
+        i = self.segment(t)
+        tau = t - self._break_list[i]
+        powers = tau ** self._exponents
+        r = self._matrix[i] @ powers
+        return r[0:2], r[2:4], r[4:6]
+
+    def sample_many(self, ts):
+        """
+        Vectorized sample(): (n, 2) arrays of position, velocity and
+        acceleration for an array of times.
+        """
+        ts = np.clip(np.asarray(ts, dtype=float), self.breaks[0], self.breaks[-1])
+        i = np.clip(np.searchsorted(self.breaks, ts, side="right") - 1, 0, len(self.coeffs) - 1)
+        tau = ts - self.breaks[i]
+        powers = tau[:, None] ** self._exponents
+        r = np.einsum("nrk,nk->nr", self._matrix[i], powers)
+        return r[:, 0:2], r[:, 2:4], r[:, 4:6]
+
+
+def _times(n, times, dt):
+    if times is None:
+        return np.arange(n) * dt
+    times = np.asarray(times, dtype=float)
+    if len(times) != n or np.any(np.diff(times) <= 0):
+        raise ValueError("times must be increasing, one per waypoint")
+    return times
+
+
+# ----------------------------------------------------------------
+# Constructors
+# ----------------------------------------------------------------
+def cubic_spline(points, times=None, dt=1.0, start_velocity=None, end_velocity=None):
+    """
+    C2 cubic spline through points at times (default: every dt). An end
+    velocity of None leaves that end natural (zero curvature).
+    """
+    p = np.asarray(points, dtype=float)
+    t = _times(len(p), times, dt)
+    h = np.diff(t)
+    n = len(p) - 1
+    if n < 1:
+        raise ValueError("need at least two points")
+    slope = np.diff(p, axis=0) / h[:, None]
+
+    # Tridiagonal system for the second derivatives M at the knots
+    lower = np.zeros(n + 1)
+    diag = np.zeros(n + 1)
+    upper = np.zeros(n + 1)
+    rhs = np.zeros((n + 1, 2))
+    lower[1:n] = h[:-1]
+    diag[1:n] = 2 * (h[:-1] + h[1:])
+    upper[1:n] = h[1:]
+    rhs[1:n] = 6 * (slope[1:] - slope[:-1])
+    if start_velocity is None:
+        diag[0] = 1.0
+    else:
+        diag[0], upper[0] = 2 * h[0], h[0]
+        rhs[0] = 6 * (slope[0] - np.asarray(start_velocity, dtype=float))
+    if end_velocity is None:
+        diag[n] = 1.0
+    else:
+        lower[n], diag[n] = h[-1], 2 * h[-1]
+        rhs[n] = 6 * (np.asarray(end_velocity, dtype=float) - slope[-1])
+    m = _solve_tridiagonal(lower, diag, upper, rhs)
+
+    coeffs = np.empty((n, 4, 2))
+    coeffs[:, 0] = p[:-1]
+    coeffs[:, 1] = slope - h[:, None] * (2 * m[:-1] + m[1:]) / 6
+    coeffs[:, 2] = m[:-1] / 2
+    coeffs[:, 3] = (m[1:] - m[:-1]) / (6 * h[:, None])
+    return FootPath(t, coeffs)
+
+
+def _solve_tridiagonal(lower, diag, upper, rhs):
+    # Thomas algorithm, for every column of rhs at once
+    n = len(diag)
+    c = np.zeros(n)
+    d = np.zeros_like(rhs)
+    c[0] = upper[0] / diag[0]
+    d[0] = rhs[0] / diag[0]
+    for i in range(1, n):
+        denominator = diag[i] - lower[i] * c[i - 1]
+        c[i] = upper[i] / denominator
+        d[i] = (rhs[i] - lower[i] * d[i - 1]) / denominator
+    x = np.empty_like(rhs)
+    x[-1] = d[-1]
+    for i in range(n - 2, -1, -1):
+        x[i] = d[i] - c[i] * x[i + 1]
+    return x
+
+
+def quintic_spline(points, times=None, dt=1.0, velocities=None, accelerations=None):
+    """
+    Quintic Hermite segments through points. Velocities and
+    accelerations at the points default to central differences, with
+    the path starting and ending at rest.
+    """
+    p = np.asarray(points, dtype=float)
+    t = _times(len(p), times, dt)
+    n = len(p) - 1
+    if n < 1:
+        raise ValueError("need at least two points")
+
+    if velocities is None:
+        v = np.zeros_like(p)
+        v[1:-1] = (p[2:] - p[:-2]) / (t[2:] - t[:-2])[:, None]
+    else:
+        v = np.asarray(velocities, dtype=float)
+    if accelerations is None:
+        a = np.zeros_like(p)
+        a[1:-1] = (v[2:] - v[:-2]) / (t[2:] - t[:-2])[:, None]
+    else:
+        a = np.asarray(accelerations, dtype=float)
+
+    h = np.diff(t)[:, None]
+    p0, p1, v0, v1, a0, a1 = p[:-1], p[1:], v[:-1], v[1:], a[:-1], a[1:]
+    coeffs = np.empty((n, 6, 2))
+    coeffs[:, 0] = p0
+    coeffs[:, 1] = v0
+    coeffs[:, 2] = a0 / 2
+    coeffs[:, 3] = (20 * (p1 - p0) - (8 * v1 + 12 * v0) * h - (3 * a0 - a1) * h ** 2) / (2 * h ** 3)
+    coeffs[:, 4] = (30 * (p0 - p1) + (14 * v1 + 16 * v0) * h + (3 * a0 - 2 * a1) * h ** 2) / (2 * h ** 4)
+    coeffs[:, 5] = (12 * (p1 - p0) - 6 * (v1 + v0) * h - (a0 - a1) * h ** 2) / (2 * h ** 5)
+    return FootPath(t, coeffs)
+
+
+def bezier(control_points, duration, start_time=0.0):
+    """
+    One Bezier curve through duration seconds.
+    """
+    q = np.asarray(control_points, dtype=float)
+    d = len(q) - 1
+    # Power basis in u = tau / duration, then scaled to tau
+    coeffs = np.zeros((1, d + 1, 2))
+    for k in range(d + 1):
+        total = sum((-1) ** (k - i) * math.comb(k, i) * q[i] for i in range(k + 1))
+        coeffs[0, k] = math.comb(d, k) * total / duration ** k
+    return FootPath([start_time, start_time + duration], coeffs)
+
+
+def swing_curve(start, end, height, duration, start_time=0.0):
+    """
+    Quintic Bezier from start to end, peaking height above the midpoint
+    of the two, with zero velocity at lift off and touch down.
+    """
+    start = np.asarray(start, dtype=float)
+    end = np.asarray(end, dtype=float)
+    # The two middle control points carry 10/32 + 10/32 of the curve at
+    # its midpoint, so raising them by 1.6 * height lifts the apex by height
+    lift = np.array([0.0, 1.6 * height])
+    return bezier([start, start, start + lift, end + lift, end, end], duration, start_time)
+
+
+def line(start, end, duration, start_time=0.0):
+    return bezier([start, end], duration, start_time)
+
+
+def concatenate(*paths):
+    """
+    Joins paths end to end in time; each starts where the previous one
+    ends, whatever its own start time.
+    """
+    degree = max(p.degree for p in paths)
+    breaks = [paths[0].breaks[0]]
+    coeffs = []
+    for p in paths:
+        c = np.zeros((len(p), degree + 1, 2))
+        c[:, :p.degree + 1] = p.coeffs
+        coeffs.append(c)
+        breaks.extend(breaks[-1] + (p.breaks[1:] - p.breaks[0]))
+    return FootPath(breaks, np.concatenate(coeffs))
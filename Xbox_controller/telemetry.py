@@ -0,0 +1,168 @@
+import numpy as np
+
+
+# ----------------------------------------------------------------
+# Telemetry recorder. All buffers are allocated up front as NumPy
+# columns (time, plus target/position/velocity/torque per joint), so
+# recording a sample in the control loop only writes into existing
+# slots. The buffers are a ring: once capacity samples are stored the
+# oldest ones are overwritten, so a long run keeps the latest window.
+#
+#   telemetry = TelemetryRecorder(joints=2, capacity=10000)
+#   telemetry.record_results(t, [m1, m2], [result1, result2])
+#   telemetry.sse()  ->  array([sse joint 1, sse joint 2])
+#
+# With log=TelemetryLog(...) every sample is also streamed to disk.
+# ----------------------------------------------------------------
+
+# Per-joint fields, in the order of the buffer rows
+FIELDS = ("target", "position", "velocity", "torque")
+
+# moteus registers for position, velocity, torque
+_REGISTERS = (1, 2, 3)
+
+
+class TelemetryRecorder:
+    def __init__(self, joints=1, capacity=100000, log=None):
+        self.joints = joints
+        self.capacity = capacity
+        self.log = log
+        self.time = np.zeros(capacity)
+        # (field, joint, sample) in one block; fields are views into it
+        self.data = np.full((len(FIELDS), joints, capacity), np.nan)
+        self.target, self.position, self.velocity, self.torque = self.data
+        self.count = 0  # samples recorded since clear(), including overwritten ones
+
+    def clear(self):
+        self.count = 0
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def wrapped(self):
+        return self.count > self.capacity
+
+    # ----------------------------------------------------------------
+    # Recording
+    # ----------------------------------------------------------------
+    def record(self, t, targets, positions=None, velocities=None, torques=None):
+        """
+        Stores one sample. Each argument is a value per joint (a scalar
+        for one joint); missing fields are stored as nan.
+        """
+        i = self.count % self.capacity
+        self.time[i] = t
+        self.target[:, i] = targets
+        self.position[:, i] = np.nan if positions is None else positions
+        self.velocity[:, i] = np.nan if velocities is None else velocities
+        self.torque[:, i] = np.nan if torques is None else torques
+        self.count += 1
+        if self.log is not None:
+            self.log.record(t, targets, position=self.position[:, i], velocity=self.velocity[:, i],
+                            torque=self.torque[:, i])
+
+    def record_results(self, t, targets, results):
+        """
+        Stores one sample from moteus query results (one per joint,
+        None where there was no reply).
+        """
+        i = self.count % self.capacity
+        self.time[i] = t
+        self.target[:, i] = targets
+        if not isinstance(results, (list, tuple)):
+            results = (results,)
+        for j, result in enumerate(results):
+            for field, register in enumerate(_REGISTERS, 1):
+                self.data[field, j, i] = result.values.get(register, np.nan) if result is not None else np.nan
+        self.count += 1
+        if self.log is not None:
+            self.log.record_results(t, targets, results)
+
+    # ----------------------------------------------------------------
+    # Views
+    # ----------------------------------------------------------------
+    def segments(self, column):
+        """
+        The recorded part of a buffer (e.g. recorder.position) as a list
+        of zero-copy views in time order: one view, or two once the ring
+        has wrapped.
+        """
+        n = len(self)
+        if not self.wrapped():
+            return [column[..., :n]]
+        i = self.count % self.capacity
+        return [column[..., i:], column[..., :i]]
+
+    def get(self, column):
+        """
+        The recorded part of a buffer in time order. A view until the
+        ring wraps, a copy after that.
+        """
+        parts = self.segments(column)
+        return parts[0] if len(parts) == 1 else np.concatenate(parts, axis=-1)
+
+    def times(self):
+        return self.get(self.time)
+
+    def targets(self):
+        return self.get(self.target)
+
+    def positions(self):
+        return self.get(self.position)
+
+    def velocities(self):
+        return self.get(self.velocity)
+
+    def torques(self):
+        return self.get(self.torque)
+
+    # ----------------------------------------------------------------
+    # Error metrics, per joint (order does not matter, so these work on
+    # the raw buffers without unwrapping the ring). Samples without a
+    # position (no reply) are left out of RMSE, MAE and max error, which
+    # are nan for a joint with no position at all. SSE is a sum, so it
+    # is inf for a joint with any sample missing: a partial sum would
+    # look better than a complete one. Same rules as
+    # TelemetryFile.metrics().
+    # ----------------------------------------------------------------
+    def error(self):
+        """
+        Target minus position, (joints, samples), in time order.
+        """
+        return self.targets() - self.positions()
+
+    def _raw_error(self):
+        n = len(self)
+        return self.target[:, :n] - self.position[:, :n]
+
+    def _valid_error(self):
+        # Error with missing samples zeroed, and the valid count per joint
+        error = self._raw_error()
+        valid = ~np.isnan(error)
+        return np.where(valid, error, 0.0), np.sum(valid, axis=1)
+
+    def valid_count(self):
+        """
+        Samples per joint that have a position.
+        """
+        return self._valid_error()[1]
+
+    def sse(self):
+        error, count = self._valid_error()
+        return np.where(count < len(self), np.inf, np.sum(error ** 2, axis=1))
+
+    def rmse(self):
+        error, count = self._valid_error()
+        return np.where(count > 0, np.sqrt(np.sum(error ** 2, axis=1) / np.maximum(count, 1)), np.nan)
+
+    def mae(self):
+        error, count = self._valid_error()
+        return np.where(count > 0, np.sum(np.abs(error), axis=1) / np.maximum(count, 1), np.nan)
+
+    def max_error(self):
+        error, count = self._valid_error()
+        return np.where(count > 0, np.max(np.abs(error), axis=1, initial=0.0), np.nan)
+
+    def metrics(self):
+        return {"sse": self.sse(), "rmse": self.rmse(), "mae": self.mae(), "max_error": self.max_error(),
+                "count": self.valid_count()}
@@ -0,0 +1,278 @@
+import json
+import os
+import struct
+import sys
+import time
+
+import numpy as np
+
+
+# ----------------------------------------------------------------
+# Binary telemetry log. A run is streamed to an append-only file of
+# fixed-width records, so a log can be read back with numpy.memmap
+# without loading it: each field (time, target, position, ...) is a
+# column of the memory-mapped record array.
+#
+# File layout:
+#   b"TLOG", uint32 header length, JSON header (padded to 8 bytes)
+#   records, one per sample, as described by the header:
+#     time       float64
+#     target     float64 per joint
+#     <register> float64 per joint, for every logged register
+#
+# The header names the joints and registers and stores the record
+# dtype, the start time and any extra metadata given to the writer.
+# Buffered records reach the file at least every flush_interval
+# seconds; a record cut short by a crash is ignored by the reader.
+#
+#   with TelemetryLog("square.tlm", joints=[1, 2]) as log:
+#       log.record_results(t, [m1, m2], [result1, result2])
+#
+#   run = open_log("square.tlm")
+#   run.column("position")[:, 0]   # joint 1 position, memory-mapped
+#
+#   python telemetry_log.py new.tlm [old.tlm] [--plot]
+# ----------------------------------------------------------------
+
+MAGIC = b"TLOG"
+VERSION = 1
+
+# moteus register numbers that can be logged
+REGISTERS = {
+    "position": 0x001,
+    "velocity": 0x002,
+    "torque": 0x003,
+    "voltage": 0x00d,
+    "temperature": 0x00e,
+    "fault": 0x00f,
+}
+
+DEFAULT_REGISTERS = ("position", "velocity", "torque")
+
+
+def record_dtype(joints, registers=DEFAULT_REGISTERS):
+    n = len(joints)
+    return np.dtype([("time", "<f8"), ("target", "<f8", (n,))] +
+                    [(name, "<f8", (n,)) for name in registers])
+
+
+class TelemetryLog:
+    def __init__(self, path, joints=(1,), registers=DEFAULT_REGISTERS, buffer=1024, flush_interval=0.5, **meta):
+        """
+        joints names the logged joints (e.g. controller ids), registers
+        the feedback registers stored for each. Records are written in
+        blocks of up to buffer samples, and at least every flush_interval
+        seconds, so a crash of this process loses at most that much of
+        the run (the file is not fsynced, so a power loss can lose more).
+        """
+        self.path = path
+        self.joints = list(joints)
+        self.registers = list(registers)
+        self.dtype = record_dtype(self.joints, self.registers)
+        self._buffer = np.zeros(buffer, dtype=self.dtype)
+        self._pending = 0
+        self.count = 0
+        self.flush_interval = flush_interval
+        self._flushed = time.monotonic()
+
+        header = {
+            "version": VERSION,
+            "joints": self.joints,
+            "registers": {name: REGISTERS[name] for name in self.registers},
+            "dtype": self.dtype.descr,
+            "start_time": time.time(),
+            "meta": meta,
+        }
+        encoded = json.dumps(header).encode()
+        encoded += b" " * (-(len(MAGIC) + 4 + len(encoded)) % 8)
+
+        self.file = open(path, "wb")
+        self.file.write(MAGIC + struct.pack("<I", len(encoded)) + encoded)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _next(self):
+        if self._pending == len(self._buffer):
+            self.flush()
+        record = self._buffer[self._pending]
+        self._pending += 1
+        self.count += 1
+        return record
+
+    def _written(self):
+        if time.monotonic() - self._flushed >= self.flush_interval:
+            self.flush()
+
+    def record(self, t, targets, **feedback):
+        """
+        Appends one sample; feedback gives a value per joint for each
+        register (e.g. position=[...]), missing ones are stored as nan.
+        """
+        record = self._next()
+        record["time"] = t
+        record["target"] = targets
+        for name in self.registers:
+            record[name] = feedback.get(name, np.nan)
+        self._written()
+
+    def record_results(self, t, targets, results):
+        """
+        Appends one sample from moteus query results (one per joint,
+        None where there was no reply).
+        """
+        record = self._next()
+        record["time"] = t
+        record["target"] = targets
+        if not isinstance(results, (list, tuple)):
+            results = (results,)
+        for name in self.registers:
+            column = record[name]
+            register = REGISTERS[name]
+            for j, result in enumerate(results):
+                column[j] = result.values.get(register, np.nan) if result is not None else np.nan
+        self._written()
+
+    def flush(self):
+        self.file.write(self._buffer[:self._pending].tobytes())
+        self.file.flush()
+        self._pending = 0
+        self._flushed = time.monotonic()
+
+    def close(self):
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+
+# ----------------------------------------------------------------
+# Reader
+# ----------------------------------------------------------------
+class TelemetryFile:
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a telemetry log")
+            (length,) = struct.unpack("<I", f.read(4))
+            self.header = json.loads(f.read(length))
+
+        self.path = path
+        self.joints = self.header["joints"]
+        self.registers = list(self.header["registers"])
+        self.dtype = np.dtype([tuple(field) for field in self.header["dtype"]])
+
+        offset = len(MAGIC) + 4 + length
+        n = (os.path.getsize(path) - offset) // self.dtype.itemsize
+        if n > 0:
+            self.records = np.memmap(path, dtype=self.dtype, mode="r", offset=offset, shape=(n,))
+        else:
+            self.records = np.zeros(0, dtype=self.dtype)
+
+    def __len__(self):
+        return len(self.records)
+
+    def column(self, name):
+        """
+        One field as a memory-mapped view: (samples,) for time,
+        (samples, joints) for the others.
+        """
+        return self.records[name]
+
+    def metrics(self, chunk=1 << 20):
+        """
+        Per-joint SSE, RMSE, MAE and max error of target vs position, and
+        the number of samples with a position, computed chunk by chunk so
+        large logs are not read in at once. Same rules as
+        TelemetryRecorder: samples without a position are left out, SSE is
+        inf for a joint missing any, the rest are nan for a joint with none.
+        """
+        n_joints = len(self.joints)
+        sse = np.zeros(n_joints)
+        abs_sum = np.zeros(n_joints)
+        max_error = np.zeros(n_joints)
+        count = np.zeros(n_joints, dtype=np.int64)
+        for start in range(0, len(self), chunk):
+            block = self.records[start:start + chunk]
+            error = np.asarray(block["target"]) - np.asarray(block["position"])
+            valid = ~np.isnan(error)
+            error = np.where(valid, error, 0.0)
+            sse += np.sum(error ** 2, axis=0)
+            abs_sum += np.sum(np.abs(error), axis=0)
+            max_error = np.maximum(max_error, np.max(np.abs(error), axis=0, initial=0.0))
+            count += np.sum(valid, axis=0)
+        some = count > 0
+        divisor = np.maximum(count, 1)
+        return {"sse": np.where(count < len(self), np.inf, sse),
+                "rmse": np.where(some, np.sqrt(sse / divisor), np.nan),
+                "mae": np.where(some, abs_sum / divisor, np.nan),
+                "max_error": np.where(some, max_error, np.nan),
+                "count": count}
+
+    def duration(self):
+        return float(self.records["time"][-1] - self.records["time"][0]) if len(self) else 0.0
+
+
+def open_log(path):
+    return TelemetryFile(path)
+
+
+# ----------------------------------------------------------------
+# Command line: summary of a run, optionally compared with an older
+# run and plotted
+# ----------------------------------------------------------------
+def summarize(run):
+    print(f"{run.path}: {len(run)} samples, {run.duration():.2f} s, joints {run.joints}, "
+          f"registers {run.registers}")
+    metrics = run.metrics()
+    for j, joint in enumerate(run.joints):
+        print(f"  joint {joint}: " + ", ".join(f"{k} {v[j]:.6g}" for k, v in metrics.items()))
+    return metrics
+
+
+def plot(runs, max_points=5000):
+    import matplotlib.pyplot as plt
+
+    fig, axes = plt.subplots(len(runs[0].joints), 1, squeeze=False, sharex=True)
+    for run in runs:
+        # Plot at most max_points samples per run
+        step = max(1, len(run) // max_points)
+        t = run.column("time")[::step]
+        t = t - t[0] if len(t) else t
+        for j, joint in enumerate(run.joints[:len(axes)]):
+            ax = axes[j][0]
+            ax.plot(t, run.column("target")[::step, j], linestyle="--", label=f"{run.path} target")
+            ax.plot(t, run.column("position")[::step, j], alpha=0.7, label=f"{run.path} position")
+            ax.set_ylabel(f"Joint {joint} (rev)")
+            ax.grid(True)
+            ax.legend()
+    axes[-1][0].set_xlabel("Time (s)")
+    plt.show()
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Summarize and compare telemetry logs")
+    parser.add_argument("log", help="telemetry log")
+    parser.add_argument("baseline", nargs="?", help="older log to compare with")
+    parser.add_argument("--plot", action="store_true", help="plot target and position")
+    args = parser.parse_args(argv)
+
+    runs = [open_log(args.log)]
+    metrics = summarize(runs[0])
+    if args.baseline:
+        runs.append(open_log(args.baseline))
+        old = summarize(runs[1])
+        for j, joint in enumerate(runs[0].joints):
+            if j < len(old["rmse"]) and old["rmse"][j] > 0:
+                print(f"  joint {joint}: RMSE {(metrics['rmse'][j] / old['rmse'][j] - 1) * 100:+.1f}% vs baseline")
+    if args.plot:
+        plot(runs)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+import math
+import time
+
+import numpy as np
+
+from Xbox_controller.ramp import ramp_calc_array, LINEAR
+from Xbox_controller.ik_equations import solve_leg_ik, solve_leg_velocity
+
+
+# ----------------------------------------------------------------
+# Trajectory compiler. A waypoint list is turned into evenly timed
+# samples of (t, x, y, m1, m2, v1, v2) in one vectorized pass: easing
+# with ramp_calc_array(), joint targets with solve_leg_ik() and joint
+# velocities (for velocity feedforward) with solve_leg_velocity().
+# Playback (TrajectoryStreamer) then only indexes the arrays each tick.
+# compile_path() does the same for a spline/Bezier FootPath (spline.py),
+# taking the foot velocity from the path itself.
+# ----------------------------------------------------------------
+
+class Trajectory:
+    def __init__(self, data, dt):
+        self.data = data  # (7, N) contiguous: t, x, y, m1, m2, v1, v2
+        self.dt = dt
+        self.t, self.x, self.y, self.m1, self.m2, self.v1, self.v2 = data
+
+    def __len__(self):
+        return self.data.shape[1]
+
+    def duration(self):
+        return self.t[-1] if len(self) else 0.0
+
+
+def compile_trajectory(waypoints, steps, mode=LINEAR, dt=0.02, solver=solve_leg_ik):
+    """
+    Interpolates `steps` samples per segment between consecutive (x, y)
+    waypoints with easing mode `mode`, ending exactly on the last
+    waypoint, and solves IK for every sample with solver (same
+    signature as solve_leg_ik()).
+    """
+    wp = np.asarray(waypoints, dtype=float)
+    start = wp[:-1, None, :]
+    delta = (wp[1:] - wp[:-1])[:, None, :]
+
+    # Same easing curve for every segment
+    k = ramp_calc_array(np.arange(steps) / steps, mode)[None, :, None]
+    xy = np.concatenate([(start + delta * k).reshape(-1, 2), wp[-1:]])
+
+    # Foot velocity from the samples, at rest at both ends
+    v = np.gradient(xy, dt, axis=0) if len(xy) > 1 else np.zeros_like(xy)
+    v[0] = v[-1] = 0.0
+    return _solve(xy, v, dt, solver)
+
+
+def _solve(xy, v, dt, solver):
+    n = len(xy)
+    data = np.empty((7, n))
+    data[0] = np.arange(n) * dt
+    data[1] = xy[:, 0]
+    data[2] = xy[:, 1]
+    data[3], data[4] = solver(data[1], data[2])
+    data[5], data[6] = solve_leg_velocity(data[1], data[2], v[:, 0], v[:, 1])
+    return Trajectory(data, dt)
+
+
+def compile_path(path, dt=0.02, solver=solve_leg_ik):
+    """
+    Samples a FootPath (spline.py) every dt seconds, ending exactly on its
+    end, and solves IK for every sample.
+    """
+    n = int(math.ceil(path.duration() / dt - 1e-9)) + 1
+    t = np.minimum(np.arange(n) * dt, path.duration())
+    xy, v, _ = path.sample_many(path.breaks[0] + t)
+    return _solve(xy, v, dt, solver)
+
+
+class TrajectoryStreamer:
+    def __init__(self, trajectory, clock=time.monotonic):
+        self.trajectory = trajectory
+        self.clock = clock
+        self.t0 = None
+        self.index = 0
+
+    def start(self):
+        self.t0 = self.clock()
+        self.index = 0
+
+    def sample(self):
+        """
+        (m1, m2) for the current time; holds the last sample once done.
+        """
+        if self.t0 is None:
+            self.start()
+        last = len(self.trajectory) - 1
+        self.index = min(int((self.clock() - self.t0) / self.trajectory.dt), last)
+        return self.trajectory.m1[self.index], self.trajectory.m2[self.index]
+
+    def velocity(self):
+        """
+        (v1, v2) joint velocities of the last sample(), for feedforward.
+        """
+        return self.trajectory.v1[self.index], self.trajectory.v2[self.index]
+
+    def isFinished(self):
+        return self.index >= len(self.trajectory) - 1
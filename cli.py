@@ -0,0 +1,254 @@
+import time
+
+_start = time.perf_counter()
+
+import argparse
+import os
+import sys
+
+
+# ----------------------------------------------------------------
+# Single entry point for the everyday workflows:
+#
+#   python cli.py stop [ids]            stop the motors (emergency path)
+#   python cli.py home [ids] [--cached] home the joints
+#   python cli.py tune [--strategy ..]  PD autotuning
+#   python cli.py teleop                Xbox controller teleoperation
+#   python cli.py replay LOG [OLD]      summarize/plot/drive a telemetry log
+#   python cli.py bench [...]           per-tick math benchmarks
+#
+# --sim (before the subcommand) runs against simulated joints.
+#
+# `stop` only puts the controllers in stopped mode, where they stop
+# driving the motors and the legs go limp. It does not first move the
+# joints to zero the way "General use moteus controller/stop.py" does;
+# use that script to park the legs. Stop frames go straight to an
+# fdcanusb when one is attached (fdcanusb_stop.py), otherwise through
+# moteus' transport discovery.
+#
+# Every subcommand imports only what it needs, inside its handler, so
+# `stop` never loads numpy, matplotlib or pygame/SDL. The time from the
+# start of this file to the point where the subcommand is ready to act
+# is printed on stderr.
+# ----------------------------------------------------------------
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+XBOX_CONTROLLER = os.path.join(ROOT, "Xbox_controller")
+
+# The modules are imported as Xbox_controller.*
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def _ready(args):
+    """
+    Called by each handler once its imports are done.
+    """
+    if args.sim:
+        from Xbox_controller.controller_pool import ControllerPool, set_pool
+        set_pool(ControllerPool.simulated())
+    print(f"startup {(time.perf_counter() - _start) * 1000:.1f} ms", file=sys.stderr)
+
+
+# ----------------------------------------------------------------
+# Subcommands
+# ----------------------------------------------------------------
+def cmd_stop(args):
+    if not args.sim:
+        # Straight to the fdcanusb when there is one, without moteus
+        from Xbox_controller.fdcanusb_stop import send_stops
+        _ready(args)
+        acknowledged = send_stops(args.ids)
+        if acknowledged is not None:
+            print(f"Stopped {args.ids} ({acknowledged} of {len(args.ids)} frames acknowledged)")
+            return 0 if acknowledged == len(args.ids) else 1
+
+    import asyncio
+    from Xbox_controller.controller_pool import get_pool
+    if args.sim:
+        _ready(args)
+
+    pool = get_pool()
+    controllers = pool.controllers(*args.ids)
+    asyncio.run(pool.transport().cycle([c.make_stop() for c in controllers]))
+    print(f"Stopped {args.ids}")
+    return 0
+
+
+def cmd_home(args):
+    import asyncio
+    from Xbox_controller.controller_pool import get_pool
+    from Xbox_controller import Homing_sequence_function as homing
+    _ready(args)
+
+    controllers = get_pool().controllers(*args.ids)
+    mode = homing.SINGLE_SPEED if args.single_speed else None
+
+    async def run():
+        if args.cached:
+            results = {}
+            for c in controllers:
+                results[c.id] = await homing.home_motor_cached(c, mode)
+            return results
+        interlock = [args.ids] if args.interlock else ()
+        return await homing.home_motors(controllers, interlock=interlock, mode=mode)
+
+    results = asyncio.run(run())
+    return 0 if all(r is not None for r in results.values()) else 1
+
+
+STRATEGY_NAMES = ("coordinate", "nelder-mead", "bayesian")
+
+
+def cmd_tune(args):
+    import asyncio
+    from Xbox_controller import pd_tuner
+    from Xbox_controller.controller_pool import get_pool
+    _ready(args)
+
+    strategy = {
+        "coordinate": pd_tuner.COORDINATE,
+        "nelder-mead": pd_tuner.NELDER_MEAD,
+        "bayesian": pd_tuner.BAYESIAN,
+    }[args.strategy]
+    plant = args.plant or ("sim" if args.sim else f"c{args.id}")
+
+    async def run():
+        if args.sim:
+            # Fresh simulated joint per trial, spread over worker processes
+            from concurrent.futures import ProcessPoolExecutor
+            workers = args.workers or os.cpu_count() or 1
+            with ProcessPoolExecutor(workers) as executor:
+                tuner = pd_tuner.PDTuner(pd_tuner.pool_trial(pd_tuner.run_sim_trial, executor),
+                                         budget=args.budget, history=pd_tuner.load_history(plant),
+                                         concurrency=workers)
+                result = await tuner.tune(strategy)
+        else:
+            controller = get_pool().get(args.id)
+
+            async def trial(kp, kd):
+                telemetry = await pd_tuner.step_test(controller, kp, kd)
+                return telemetry.sse()[0]
+
+            tuner = pd_tuner.PDTuner(trial, budget=args.budget, history=pd_tuner.load_history(plant))
+            result = await tuner.tune(strategy)
+        pd_tuner.save_history(plant, tuner.history)
+        return result
+
+    asyncio.run(run())
+    return 0
+
+
+def cmd_teleop(args):
+    import runpy
+    _ready(args)
+
+    # Runs the script's main(); with --sim the pool is already simulated
+    runpy.run_path(os.path.join(XBOX_CONTROLLER, "Controller control.py"), run_name="__main__")
+    return 0
+
+
+def cmd_replay(args):
+    from Xbox_controller import telemetry_log
+    _ready(args)
+
+    telemetry_log.main([args.log] + ([args.baseline] if args.baseline else []) +
+                       (["--plot"] if args.plot else []))
+    if args.drive:
+        import asyncio
+        asyncio.run(_drive(telemetry_log.open_log(args.log)))
+    return 0
+
+
+async def _drive(run):
+    """
+    Sends the logged targets to the logged joints again, on the logged
+    timing.
+    """
+    import math
+    import numpy as np
+    from Xbox_controller.controller_pool import get_pool
+    from Xbox_controller.dispatch import set_positions, set_stops
+    from Xbox_controller.scheduler import FixedRateLoop
+
+    t = np.asarray(run.column("time"))
+    t = t - t[0]
+    targets = run.column("target")
+    controllers = get_pool().controllers(*run.joints)
+    rate = 1.0 / np.median(np.diff(t)) if len(t) > 1 else 100.0
+    start = time.monotonic()
+
+    async def tick():
+        i = min(int(np.searchsorted(t, time.monotonic() - start, side="right")) - 1, len(t) - 1)
+        await set_positions(controllers, [float(v) for v in targets[max(i, 0)]],
+                            accel_limit=20, watchdog_timeout=math.nan)
+        if i >= len(t) - 1:
+            return False
+
+    try:
+        await FixedRateLoop(rate).run(tick)
+    finally:
+        await set_stops(controllers)
+
+
+def cmd_bench(args):
+    from Xbox_controller import bench
+    _ready(args)
+    return bench.main(args.bench_args)
+
+
+# ----------------------------------------------------------------
+# Command line
+# ----------------------------------------------------------------
+def parser():
+    p = argparse.ArgumentParser(description="Leg control workflows")
+    p.add_argument("--sim", action="store_true", help="use simulated joints instead of the CAN bus")
+    sub = p.add_subparsers(dest="command", required=True)
+
+    s = sub.add_parser("stop", help="stop the motors (no move to zero, see stop.py)")
+    s.add_argument("ids", nargs="*", type=int, default=[1, 2])
+    s.set_defaults(handler=cmd_stop)
+
+    s = sub.add_parser("home", help="home the joints")
+    s.add_argument("ids", nargs="*", type=int, default=[1, 2])
+    s.add_argument("--cached", action="store_true", help="verify the cached calibration with one touch")
+    s.add_argument("--single-speed", action="store_true", help="single-speed limit search")
+    s.add_argument("--interlock", action="store_true", help="home the joints one after another")
+    s.set_defaults(handler=cmd_home)
+
+    s = sub.add_parser("tune", help="PD autotuning")
+    s.add_argument("--id", type=int, default=1)
+    s.add_argument("--strategy", choices=STRATEGY_NAMES, default="nelder-mead")
+    s.add_argument("--budget", type=int, default=20, help="trials in this session")
+    s.add_argument("--plant", help="name the results are stored under (warm start)")
+    s.add_argument("--workers", type=int, help="worker processes with --sim")
+    s.set_defaults(handler=cmd_tune)
+
+    s = sub.add_parser("teleop", help="Xbox controller teleoperation")
+    s.set_defaults(handler=cmd_teleop)
+
+    s = sub.add_parser("replay", help="summarize, plot or drive a telemetry log")
+    s.add_argument("log")
+    s.add_argument("baseline", nargs="?", help="older log to compare with")
+    s.add_argument("--plot", action="store_true")
+    s.add_argument("--drive", action="store_true", help="send the logged targets to the joints again")
+    s.set_defaults(handler=cmd_replay)
+
+    # Everything after `bench` is passed on to bench.py
+    s = sub.add_parser("bench", help="per-tick math benchmarks (arguments go to bench.py)")
+    s.set_defaults(handler=cmd_bench)
+    return p
+
+
+def main(argv=None):
+    p = parser()
+    args, rest = p.parse_known_args(argv)
+    if args.command == "bench":
+        args.bench_args = rest
+    elif rest:
+        p.error(f"unrecognized arguments: {' '.join(rest)}")
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
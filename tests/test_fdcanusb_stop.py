@@ -0,0 +1,43 @@
+import os
+import pty
+import threading
+
+from Xbox_controller.fdcanusb_stop import send_stops, stop_command
+
+
+def _adapter(replies):
+    # A pty standing in for the fdcanusb; returns its path and the lines it got
+    master, slave = pty.openpty()
+    lines = []
+
+    def serve():
+        buffer = b""
+        while len(lines) < replies:
+            buffer += os.read(master, 256)
+            while b"\n" in buffer:
+                line, buffer = buffer.split(b"\n", 1)
+                lines.append(line)
+                os.write(master, b"OK\r\n")
+
+    threading.Thread(target=serve, daemon=True).start()
+    return os.ttyname(slave), lines
+
+
+def test_stop_command():
+    # Same line moteus writes for Controller(2).make_stop(), minus its checksum
+    assert stop_command(2) == b"can send 0002 010000 BF\n"
+
+
+def test_send_stops():
+    path, lines = _adapter(2)
+    assert send_stops([1, 2], paths=[path]) == 2
+    assert lines == [b"can send 0001 010000 BF", b"can send 0002 010000 BF"]
+
+
+def test_unacknowledged():
+    master, slave = pty.openpty()
+    assert send_stops([1], paths=[os.ttyname(slave)], timeout=0.01) == 0
+
+
+def test_no_fdcanusb():
+    assert send_stops([1], paths=[]) is None
@@ -0,0 +1,89 @@
+import asyncio
+import functools
+
+import pytest
+
+from Xbox_controller import Homing_sequence_function as homing
+from Xbox_controller.controller_pool import ControllerPool, get_pool, set_pool
+
+TRAVEL = 2.4  # SimMotor hard stops at +-1.2 rev
+
+
+@pytest.fixture(autouse=True)
+def fast_homing(monkeypatch, tmp_path):
+    # Simulated time moves 5 ms per bus cycle, so nothing needs to sleep
+    monkeypatch.setattr(homing, "process_sleep", 0.0)
+    monkeypatch.setattr(homing, "poll_period", 0.0)
+    monkeypatch.setattr(homing, "home_motors", functools.partial(homing.home_motors, period=0.0))
+    monkeypatch.setattr(homing, "calibration_path", str(tmp_path / "calibration.json"))
+    pool = get_pool()
+    yield
+    set_pool(pool)
+
+
+def _power_up(pos_limit=1.2):
+    # Fresh simulated joints, as after a power cycle
+    pool = ControllerPool.simulated(0.005)
+    set_pool(pool)
+    controllers = pool.controllers(1, 2)
+    for c in controllers:
+        pool.transport().motor(c.id).pos_limit = pos_limit
+    return pool, controllers
+
+
+def _run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def _no_full_homing(monkeypatch):
+    async def fail(*args, **kwargs):
+        raise AssertionError("full homing was run")
+    monkeypatch.setattr(homing, "home_motors", fail)
+    monkeypatch.setattr(homing, "home_motor", fail)
+
+
+def test_full_homing(capsys):
+    pool, controllers = _power_up()
+    results = _run(homing.home_motors(controllers))
+    calibration = homing.load_calibration()
+    for c in controllers:
+        assert results[c.id].travel == pytest.approx(TRAVEL, abs=homing.verify_tolerance)
+        assert calibration[str(c.id)]["boot_frame"] is True
+        motor = pool.transport().motor(c.id)
+        assert motor.home_state == homing.OUTPUT_HOMED
+        # Zero is now the midpoint of the stops
+        assert motor.position + motor.offset == pytest.approx(0.0, abs=homing.midpoint_tolerance)
+
+
+def test_cached_in_same_session(monkeypatch, capsys):
+    pool, controllers = _power_up()
+    _run(homing.home_motors(controllers))
+    _no_full_homing(monkeypatch)
+    results = _run(homing.home_motors_cached(controllers))
+    for c in controllers:
+        assert results[c.id].travel == TRAVEL
+
+
+def test_cached_after_power_cycle(monkeypatch, capsys):
+    _run(homing.home_motors(_power_up()[1]))
+    pool, controllers = _power_up()
+    _no_full_homing(monkeypatch)
+    results = _run(homing.home_motors_cached(controllers))
+    for c in controllers:
+        assert results[c.id].pos_limit == pytest.approx(1.2, abs=homing.verify_tolerance)
+
+
+def test_moved_stop_falls_back_to_full_homing(capsys):
+    _run(homing.home_motors(_power_up()[1]))
+    pool, controllers = _power_up(pos_limit=1.0)
+    results = _run(homing.home_motors_cached(controllers))
+    for c in controllers:
+        assert results[c.id].travel == pytest.approx(2.2, abs=homing.verify_tolerance)
+    assert homing.load_calibration()["1"]["travel"] == pytest.approx(2.2, abs=homing.verify_tolerance)
+
+
+def test_no_cache_runs_full_homing(capsys):
+    pool, controllers = _power_up()
+    result = _run(homing.home_motor_cached(controllers[0]))
+    assert result.travel == pytest.approx(TRAVEL, abs=homing.verify_tolerance)
+    assert "1" in homing.load_calibration()
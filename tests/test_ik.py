@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from Xbox_controller.ik_equations import leg_jacobian, solve_leg_ik, solve_leg_velocity
+from Xbox_controller.ik_grid import IKGrid, reach_margin
+
+# Foot positions well inside the workspace
+POINTS = [(10.0, -50.0), (-40.0, -80.0), (60.0, -30.0), (0.0, -60.0), (-70.0, -20.0)]
+
+
+def test_points_in_reach():
+    assert all(reach_margin(x, y) > 5.0 for x, y in POINTS)
+
+
+def _finite_difference(x, y, h=1e-4):
+    dx = (np.array(solve_leg_ik(x + h, y)) - np.array(solve_leg_ik(x - h, y))) / (2 * h)
+    dy = (np.array(solve_leg_ik(x, y + h)) - np.array(solve_leg_ik(x, y - h))) / (2 * h)
+    return dx[0], dy[0], dx[1], dy[1]
+
+
+@pytest.mark.parametrize("x, y", POINTS)
+def test_jacobian_matches_finite_differences(x, y):
+    np.testing.assert_allclose(leg_jacobian(x, y), _finite_difference(x, y), rtol=1e-5, atol=1e-9)
+
+
+def test_jacobian_array_matches_scalar():
+    xs = np.array([p[0] for p in POINTS])
+    ys = np.array([p[1] for p in POINTS])
+    columns = leg_jacobian(xs, ys)
+    for i, (x, y) in enumerate(POINTS):
+        np.testing.assert_allclose([c[i] for c in columns], leg_jacobian(x, y), rtol=1e-12)
+
+
+def test_solve_leg_ik_array_matches_scalar():
+    xs = np.array([p[0] for p in POINTS])
+    ys = np.array([p[1] for p in POINTS])
+    m1, m2 = solve_leg_ik(xs, ys)
+    for i, (x, y) in enumerate(POINTS):
+        assert (m1[i], m2[i]) == pytest.approx(solve_leg_ik(x, y), rel=1e-12)
+
+
+def test_velocity_is_jacobian_times_foot_velocity():
+    x, y, vx, vy, dt = 10.0, -50.0, 30.0, -20.0, 1e-5
+    before = np.array(solve_leg_ik(x, y))
+    after = np.array(solve_leg_ik(x + vx * dt, y + vy * dt))
+    np.testing.assert_allclose(solve_leg_velocity(x, y, vx, vy), (after - before) / dt, rtol=1e-3)
+
+
+@pytest.fixture(scope="module")
+def grid():
+    return IKGrid.build(x_range=(-100.0, 100.0), y_range=(-120.0, 0.0))
+
+
+def test_grid_within_max_error(grid):
+    rng = np.random.default_rng(0)
+    xs = rng.uniform(-100.0, 100.0, 2000)
+    ys = rng.uniform(-120.0, 0.0, 2000)
+    keep = reach_margin(xs, ys) > 0
+    exact = np.stack(solve_leg_ik(xs[keep], ys[keep]))
+    approx = np.array([grid.solve(x, y) for x, y in zip(xs[keep], ys[keep])]).T
+    assert grid.max_error <= grid.tolerance
+    assert np.max(np.abs(approx - exact)) <= grid.max_error + 1e-12
+
+
+def test_grid_falls_back_off_grid(grid):
+    assert grid.solve(140.0, 50.0) == pytest.approx(solve_leg_ik(140.0, 50.0), rel=1e-12)
+
+
+def test_grid_save_and_load(grid, tmp_path):
+    grid.save(str(tmp_path))
+    loaded = IKGrid.load(str(tmp_path))
+    assert loaded.max_error == grid.max_error
+    assert loaded.solve(10.0, -50.0) == grid.solve(10.0, -50.0)
@@ -0,0 +1,81 @@
+import asyncio
+import math
+
+import numpy as np
+import pytest
+
+from Xbox_controller import pd_tuner
+from Xbox_controller.pd_tuner import BAYESIAN, COORDINATE, NELDER_MEAD, PDTuner, sim_trial
+
+STRATEGIES = [COORDINATE, NELDER_MEAD, BAYESIAN]
+
+
+@pytest.fixture(scope="module")
+def grid_best():
+    # Best SSE of an 8x8 grid search on the simulated joint
+    gains = np.linspace(0.01, 2.0, 8)
+    return min(pd_tuner.run_sim_trial(kp, kd) for kp in gains for kd in gains)
+
+
+def _tune(tuner, strategy):
+    return asyncio.run(tuner.tune(strategy))
+
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+def test_matches_grid_on_simulated_joint(strategy, grid_best, capsys):
+    tuner = PDTuner(sim_trial, budget=30, seed=1)
+    kp, kd, sse = _tune(tuner, strategy)
+    assert tuner.trials <= 30
+    assert sse <= 1.1 * grid_best
+    assert sse == pytest.approx(pd_tuner.run_sim_trial(kp, kd))
+
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+def test_finds_interior_minimum(strategy, capsys):
+    async def trial(kp, kd):
+        return (kp - 0.7) ** 2 + 2 * (kd - 1.3) ** 2 + 0.01
+
+    kp, kd, sse = _tune(PDTuner(trial, budget=40, seed=1), strategy)
+    assert sse < 0.02
+    assert kp == pytest.approx(0.7, abs=0.1)
+    assert kd == pytest.approx(1.3, abs=0.1)
+
+
+def test_history_is_not_rerun(capsys):
+    calls = []
+
+    async def trial(kp, kd):
+        calls.append((kp, kd))
+        return kp + kd
+
+    tuner = PDTuner(trial, budget=5)
+    _tune(tuner, COORDINATE)
+    first = list(calls)
+    warm = PDTuner(trial, budget=5, history=tuner.history)
+    best = _tune(warm, COORDINATE)
+    assert not set(calls[len(first):]) & set(first)
+    assert best[2] <= tuner.best()[2]
+
+
+def test_failed_trials_do_not_break_bayesian(capsys):
+    async def trial(kp, kd):
+        return math.inf if kp > 1.0 else (kp - 0.5) ** 2 + (kd - 0.5) ** 2
+
+    kp, kd, sse = _tune(PDTuner(trial, budget=15, seed=2), BAYESIAN)
+    assert math.isfinite(sse)
+
+
+def test_no_budget_and_no_history():
+    async def trial(kp, kd):
+        return 0.0
+
+    with pytest.raises(ValueError):
+        _tune(PDTuner(trial, budget=0), NELDER_MEAD)
+
+
+def test_history_file(tmp_path):
+    path = str(tmp_path / "tuning.json")
+    assert pd_tuner.load_history("leg1", path) == []
+    pd_tuner.save_history("leg1", [(0.5, 0.2, 0.01)], path)
+    pd_tuner.save_history("leg2", [(1.0, 1.0, 0.02)], path)
+    assert pd_tuner.load_history("leg1", path) == [(0.5, 0.2, 0.01)]
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from Xbox_controller import ramp
+
+MODES = range(ramp.LINEAR, ramp.BOUNCE_INOUT + 1)
+K = np.linspace(0.0, 1.0, 1001)
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_ramp_calc_array_matches_ramp_calc(mode):
+    exact = [ramp.ramp_calc(float(k), mode) for k in K]
+    np.testing.assert_allclose(ramp.ramp_calc_array(K, mode), exact, rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_ramp_calc_ends(mode):
+    assert ramp.ramp_calc(0.0, mode) == pytest.approx(0.0, abs=1e-12)
+    assert ramp.ramp_calc(1.0, mode) == pytest.approx(1.0, abs=1e-12)
+
+
+@pytest.mark.parametrize("mode", sorted(ramp.LUT_MODES))
+def test_lut_error(mode):
+    error = ramp.ramp_lut_error(mode)
+    assert error < 2e-3
+    lut = [ramp.ramp_calc_lut(float(k), mode) for k in K]
+    np.testing.assert_allclose(lut, ramp.ramp_calc_array(K, mode), rtol=0, atol=error + 1e-12)
+
+
+def test_ramp_reaches_target_with_lut():
+    clock = ramp.ManualClock()
+    r = ramp.Ramp(0, clock=clock)
+    r.setAutomation(False)
+    r.setLUT()
+    r.go(100, 1000, ramp.BOUNCE_OUT)
+    while not r.isFinished():
+        clock.advance(10)
+        r.update()
+    assert r.getValue() == pytest.approx(100)
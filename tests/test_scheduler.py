@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from Xbox_controller.scheduler import CATCHUP, SKIP, FixedRateLoop
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _run(policy, durations):
+    # One tick per entry of durations, each taking that many periods
+    clock = FakeClock()
+    loop = FixedRateLoop(rate_hz=1000, policy=policy, clock=clock)
+    ticks = iter(durations)
+
+    async def body():
+        duration = next(ticks, None)
+        if duration is None:
+            return False
+        clock.now += duration * loop.period
+
+    asyncio.run(loop.run(body))
+    return loop
+
+
+def test_on_time():
+    loop = _run(SKIP, [0.5] * 10)
+    assert loop.ticks == 11  # the last one returns False
+    assert loop.overruns == 0
+    assert loop.skipped == 0
+
+
+def test_skip_drops_missed_deadlines():
+    loop = _run(SKIP, [0.5, 2.5, 0.5, 0.5])
+    assert loop.overruns == 1
+    assert loop.skipped == 2
+    assert loop.worst_tick == pytest.approx(2.5 * loop.period)
+
+
+def test_catchup_keeps_every_deadline():
+    loop = _run(CATCHUP, [0.5, 2.5, 0.5, 0.5])
+    # The tick after the slow one is late too, the next is back on time
+    assert loop.overruns == 2
+    assert loop.skipped == 0
+
+
+def test_stop():
+    loop = FixedRateLoop(rate_hz=1000)
+
+    async def body():
+        loop.stop()
+
+    asyncio.run(loop.run(body))
+    assert loop.ticks == 1
+    assert not loop.running
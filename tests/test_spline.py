@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from Xbox_controller import spline
+
+WAYPOINTS = [(0.0, -50.0), (20.0, -40.0), (35.0, -55.0), (10.0, -70.0), (-15.0, -60.0)]
+TIMES = [0.0, 0.2, 0.5, 0.6, 1.0]
+
+
+def _derivative(path, t, h=1e-6):
+    return (path.sample(t + h)[0] - path.sample(t - h)[0]) / (2 * h)
+
+
+@pytest.mark.parametrize("build", [spline.cubic_spline, spline.quintic_spline])
+def test_passes_through_waypoints(build):
+    path = build(WAYPOINTS, TIMES)
+    for t, p in zip(TIMES, WAYPOINTS):
+        np.testing.assert_allclose(path.sample(t)[0], p, atol=1e-9)
+
+
+@pytest.mark.parametrize("build", [spline.cubic_spline, spline.quintic_spline])
+def test_velocity_is_derivative(build):
+    path = build(WAYPOINTS, TIMES)
+    for t in (0.1, 0.35, 0.55, 0.8):
+        np.testing.assert_allclose(path.sample(t)[1], _derivative(path, t), rtol=1e-5, atol=1e-5)
+
+
+def test_cubic_spline_is_c2():
+    path = spline.cubic_spline(WAYPOINTS, TIMES)
+    for t in TIMES[1:-1]:
+        before = path.sample(t - 1e-9)
+        after = path.sample(t + 1e-9)
+        for b, a in zip(before, after):
+            np.testing.assert_allclose(b, a, atol=1e-5)
+
+
+def test_cubic_spline_end_velocity():
+    path = spline.cubic_spline(WAYPOINTS, TIMES, start_velocity=(0, 0), end_velocity=(5, -5))
+    np.testing.assert_allclose(path.sample(0.0)[1], (0, 0), atol=1e-9)
+    np.testing.assert_allclose(path.sample(1.0)[1], (5, -5), atol=1e-9)
+
+
+def test_swing_curve():
+    path = spline.swing_curve((-30.0, -50.0), (30.0, -50.0), 25.0, 0.25)
+    np.testing.assert_allclose(path.sample(0.0)[1], (0, 0), atol=1e-9)
+    np.testing.assert_allclose(path.sample(0.25)[1], (0, 0), atol=1e-9)
+    np.testing.assert_allclose(path.sample(0.125)[0], (0.0, -25.0), atol=1e-9)
+
+
+def test_sample_many_matches_sample():
+    path = spline.concatenate(spline.line((30, -50), (-30, -50), 0.5),
+                              spline.swing_curve((-30, -50), (30, -50), 30, 0.25))
+    ts = np.linspace(-0.1, 0.9, 101)
+    positions, velocities, accelerations = path.sample_many(ts)
+    for i, t in enumerate(ts):
+        p, v, a = path.sample(t)
+        np.testing.assert_allclose(positions[i], p, atol=1e-9)
+        np.testing.assert_allclose(velocities[i], v, atol=1e-9)
+        np.testing.assert_allclose(accelerations[i], a, atol=1e-9)
+
+
+def test_times_must_increase():
+    with pytest.raises(ValueError):
+        spline.cubic_spline(WAYPOINTS, [0.0, 0.2, 0.2, 0.6, 1.0])
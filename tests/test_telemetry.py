@@ -0,0 +1,93 @@
+import math
+
+import numpy as np
+import pytest
+
+from Xbox_controller.telemetry import TelemetryRecorder
+from Xbox_controller.telemetry_log import TelemetryLog, open_log
+
+
+def _samples(n=200):
+    # Two joints; joint 2 misses a reply every tenth sample
+    t = np.arange(n) * 0.01
+    targets = np.stack([np.sin(t), np.cos(t)], axis=1)
+    positions = targets - 0.01 * np.stack([np.cos(3 * t), np.sin(5 * t)], axis=1)
+    positions[::10, 1] = np.nan
+    return t, targets, positions
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "run.tlm")
+    t, targets, positions = _samples()
+    with TelemetryLog(path, joints=[1, 2], buffer=16, note="test") as log:
+        for i in range(len(t)):
+            log.record(t[i], targets[i], position=positions[i])
+
+    run = open_log(path)
+    assert len(run) == len(t)
+    assert run.joints == [1, 2]
+    assert run.header["meta"] == {"note": "test"}
+    np.testing.assert_array_equal(run.column("time"), t)
+    np.testing.assert_array_equal(run.column("target"), targets)
+    np.testing.assert_array_equal(run.column("position"), positions)
+    assert np.all(np.isnan(run.column("velocity")))
+
+
+def test_log_and_recorder_metrics_agree(tmp_path):
+    path = str(tmp_path / "run.tlm")
+    t, targets, positions = _samples()
+    recorder = TelemetryRecorder(2, capacity=len(t))
+    with TelemetryLog(path, joints=[1, 2]) as log:
+        for i in range(len(t)):
+            log.record(t[i], targets[i], position=positions[i])
+            recorder.record(t[i], targets[i], positions[i])
+
+    from_log = open_log(path).metrics(chunk=7)
+    from_recorder = recorder.metrics()
+    for name in ("sse", "rmse", "mae", "max_error", "count"):
+        np.testing.assert_allclose(from_log[name], from_recorder[name], rtol=1e-12)
+
+    # Joint 2 is missing samples: no SSE, the rest over what it has
+    assert from_log["count"].tolist() == [200, 180]
+    assert math.isinf(from_log["sse"][1])
+    assert np.isfinite(from_log["rmse"][1])
+
+
+def test_metrics_without_positions(tmp_path):
+    path = str(tmp_path / "run.tlm")
+    recorder = TelemetryRecorder(1, capacity=4)
+    with TelemetryLog(path) as log:
+        for i in range(4):
+            log.record(i * 0.01, [1.0])
+            recorder.record(i * 0.01, [1.0])
+    for metrics in (open_log(path).metrics(), recorder.metrics()):
+        assert metrics["count"][0] == 0
+        assert math.isinf(metrics["sse"][0])
+        assert math.isnan(metrics["rmse"][0])
+        assert math.isnan(metrics["max_error"][0])
+
+
+def test_flush_interval(tmp_path):
+    path = str(tmp_path / "run.tlm")
+    log = TelemetryLog(path, flush_interval=0.0)
+    log.record(0.0, [1.0], position=[0.5])
+    # Readable before close
+    assert len(open_log(path)) == 1
+    log.close()
+
+
+def test_torn_record_ignored(tmp_path):
+    path = str(tmp_path / "run.tlm")
+    with TelemetryLog(path) as log:
+        for i in range(3):
+            log.record(i * 0.01, [1.0], position=[0.5])
+    with open(path, "ab") as f:
+        f.write(b"\x00" * 5)
+    assert len(open_log(path)) == 3
+
+
+def test_not_a_log(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"nope")
+    with pytest.raises(ValueError):
+        open_log(str(path))